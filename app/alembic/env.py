@@ -8,6 +8,10 @@ from app.database import Base
 from app.models.user_model import User
 from app.models.file_model import FileUpload
 from app.models.refresh_token_model import RefreshToken
+from app.models.email_outbox_model import EmailOutbox
+from app.models.audit_log_model import AuditLog
+from app.models.upload_session_model import UploadSession
+from app.models.activity_rollup_model import ActivityRollup, ActiveUserMark
 
 # this is the Alembic Config object, which provides
 config = context.config
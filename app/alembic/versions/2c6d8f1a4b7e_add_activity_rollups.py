@@ -0,0 +1,47 @@
+"""add activity rollups
+
+Revision ID: 2c6d8f1a4b7e
+Revises: f7c2b9e4a1d3
+Create Date: 2026-10-19 21:07:42.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c6d8f1a4b7e'
+down_revision: Union[str, Sequence[str], None] = 'f7c2b9e4a1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Counters start at deploy time: users carry no creation timestamp and
+    # only the latest login is stored, so history cannot be rebuilt
+    op.create_table(
+        'activity_rollups',
+        sa.Column('metric', sa.String(length=32), nullable=False),
+        sa.Column('bucket', sa.String(length=8), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('metric', 'bucket', 'bucket_start'),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'activity_active_users',
+        sa.Column('bucket', sa.String(length=8), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket', 'bucket_start', 'user_id'),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('activity_active_users')
+    op.drop_table('activity_rollups')
@@ -0,0 +1,67 @@
+"""add foreign key and lookup indexes
+
+Revision ID: 5f2c1e7a9b3d
+Revises: 35b8e32d672b
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2c1e7a9b3d'
+down_revision: Union[str, Sequence[str], None] = '35b8e32d672b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_refresh_tokens_user_id', 'refresh_tokens', ['user_id']),
+    ('ix_refresh_tokens_expires_at', 'refresh_tokens', ['expires_at']),
+    ('ix_refresh_tokens_revoked', 'refresh_tokens', ['revoked']),
+    ('ix_file_uploads_owner_id', 'file_uploads', ['owner_id']),
+]
+
+
+def _drop_invalid_index(name: str) -> None:
+    """
+    A CREATE INDEX CONCURRENTLY that failed (or was interrupted) leaves an
+    INVALID index behind; drop it so re-running the migration rebuilds it.
+    """
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).first()
+    if invalid:
+        op.execute(sa.text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # CONCURRENTLY cannot run inside a transaction block; building this
+        # way does not block writes to the tables while the index is built
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                _drop_invalid_index(name)
+                op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)
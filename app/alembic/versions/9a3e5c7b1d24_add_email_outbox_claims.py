@@ -0,0 +1,35 @@
+"""add email_outbox claim columns
+
+Revision ID: 9a3e5c7b1d24
+Revises: 2c6d8f1a4b7e
+Create Date: 2026-10-20 09:12:40.361958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3e5c7b1d24'
+down_revision: Union[str, Sequence[str], None] = '2c6d8f1a4b7e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A table created by create_all (run when env.py imports app.database)
+    # already has the columns
+    existing = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('email_outbox')}
+    if 'claimed_by' not in existing:
+        op.add_column('email_outbox', sa.Column('claimed_by', sa.String(length=32), nullable=True))
+    if 'claimed_at' not in existing:
+        op.add_column('email_outbox', sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('email_outbox', 'claimed_at')
+    op.drop_column('email_outbox', 'claimed_by')
@@ -0,0 +1,85 @@
+"""add audit_log
+
+Revision ID: b3a7c9d1e5f2
+Revises: 8d4e6b2f0c71
+Create Date: 2026-10-19 14:21:08.113604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3a7c9d1e5f2'
+down_revision: Union[str, Sequence[str], None] = '8d4e6b2f0c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # May already exist: env.py imports app.database, which runs create_all
+    op.create_table(
+        'audit_log',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('actor_id', sa.Integer(), nullable=True),
+        sa.Column('action', sa.String(), nullable=False),
+        sa.Column('target_type', sa.String(), nullable=True),
+        sa.Column('target_id', sa.String(), nullable=True),
+        sa.Column('ip_address', sa.String(), nullable=True),
+        sa.Column('user_agent', sa.String(), nullable=True),
+        sa.Column('method', sa.String(), nullable=True),
+        sa.Column('path', sa.String(), nullable=True),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(op.f('ix_audit_log_id'), 'audit_log', ['id'], unique=False, if_not_exists=True)
+    op.create_index(op.f('ix_audit_log_created_at'), 'audit_log', ['created_at'], unique=False, if_not_exists=True)
+    op.create_index('ix_audit_log_actor_id_id', 'audit_log', ['actor_id', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_audit_log_action_id', 'audit_log', ['action', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_audit_log_target_id', 'audit_log', ['target_type', 'target_id', 'id'], unique=False, if_not_exists=True)
+
+    # Append-only for every client, not just the ORM
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            """
+            CREATE OR REPLACE FUNCTION audit_log_append_only() RETURNS trigger AS $$
+            BEGIN
+                RAISE EXCEPTION 'audit_log is append-only';
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        op.execute(
+            """
+            DO $$
+            BEGIN
+                IF NOT EXISTS (
+                    SELECT 1 FROM pg_trigger
+                    WHERE tgname = 'audit_log_append_only' AND tgrelid = 'audit_log'::regclass
+                ) THEN
+                    CREATE TRIGGER audit_log_append_only
+                    BEFORE UPDATE OR DELETE ON audit_log
+                    FOR EACH ROW EXECUTE FUNCTION audit_log_append_only();
+                END IF;
+            END
+            $$
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS audit_log_append_only ON audit_log")
+        op.execute("DROP FUNCTION IF EXISTS audit_log_append_only()")
+    op.drop_index('ix_audit_log_target_id', table_name='audit_log')
+    op.drop_index('ix_audit_log_action_id', table_name='audit_log')
+    op.drop_index('ix_audit_log_actor_id_id', table_name='audit_log')
+    op.drop_index(op.f('ix_audit_log_created_at'), table_name='audit_log')
+    op.drop_index(op.f('ix_audit_log_id'), table_name='audit_log')
+    op.drop_table('audit_log')
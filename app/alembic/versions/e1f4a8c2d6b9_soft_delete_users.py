@@ -0,0 +1,72 @@
+"""soft delete users with partial indexes
+
+Revision ID: e1f4a8c2d6b9
+Revises: b3a7c9d1e5f2
+Create Date: 2026-10-19 16:48:52.907315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f4a8c2d6b9'
+down_revision: Union[str, Sequence[str], None] = 'b3a7c9d1e5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LIVE = sa.text('deleted_at IS NULL')
+DELETED = sa.text('deleted_at IS NOT NULL')
+
+# (name, columns, unique, where)
+INDEXES = [
+    ('ix_users_email_live', ['email'], True, LIVE),
+    ('ix_users_live_role_id', ['role', 'id'], False, LIVE),
+    ('ix_users_deleted_at', ['deleted_at'], False, DELETED),
+]
+
+
+def _drop_invalid_index(name: str) -> None:
+    """Drops an INVALID index left by a failed CREATE INDEX CONCURRENTLY."""
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).first()
+    if invalid:
+        op.execute(sa.text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Built without blocking writes to users; see 5f2c1e7a9b3d
+        with op.get_context().autocommit_block():
+            for name, columns, unique, where in INDEXES:
+                _drop_invalid_index(name)
+                op.create_index(
+                    name, 'users', columns, unique=unique, if_not_exists=True,
+                    postgresql_where=where, postgresql_concurrently=True,
+                )
+            # The partial unique index now enforces email uniqueness
+            op.drop_index('ix_users_email', table_name='users', if_exists=True, postgresql_concurrently=True)
+    else:
+        for name, columns, unique, where in INDEXES:
+            op.create_index(name, 'users', columns, unique=unique, if_not_exists=True, sqlite_where=where)
+        op.drop_index('ix_users_email', table_name='users', if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fails if an email was re-registered while an older account was deactivated
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    for name, _, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='users', if_exists=True)
+    op.drop_column('users', 'deleted_at')
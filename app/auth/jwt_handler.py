@@ -1,37 +1,129 @@
-from jose import JWTError, jwt
+from jose import JWTError, jwt, jwk
 from jose import ExpiredSignatureError
+import hashlib
+import hmac
+import math
+import time
 from datetime import datetime, timedelta
+from typing import List
+from uuid import uuid4
 
+from app.auth.permissions import permissions_for_role
+from app.auth.token_denylist import denylist
 from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS, REFRESH_SECRET_KEY
+from app.config import EMAIL_VERIFICATION_SECRET, EMAIL_VERIFICATION_EXPIRE_HOURS
+
+# Keys are constructed once instead of being parsed from the secret string
+# on every encode/decode call
+_ACCESS_KEY = jwk.construct(SECRET_KEY, ALGORITHM)
+_REFRESH_KEY = jwk.construct(REFRESH_SECRET_KEY, ALGORITHM)
+# Verification links get their own key, so they can never pass as access tokens
+_EMAIL_VERIFICATION_KEY = jwk.construct(
+    EMAIL_VERIFICATION_SECRET
+    or hmac.new(SECRET_KEY.encode(), b"email-verification", hashlib.sha256).hexdigest(),
+    ALGORITHM,
+)
+_ALGORITHMS = [ALGORITHM]
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
+    # Embed the role's permission bitmask so routes can authorize without the DB
+    to_encode.setdefault("perms", permissions_for_role(to_encode.get("role")))
     now = datetime.utcnow()
     expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire, "iat": now})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    # jti identifies this token so it can be revoked before it expires; iat
+    # keeps milliseconds so a per-user revocation can tell apart tokens
+    # issued just before and just after it. Truncated, never rounded up past
+    # a revocation made right after
+    to_encode.update({"exp": expire, "iat": math.floor(time.time() * 1000) / 1000, "jti": uuid4().hex})
+    return jwt.encode(to_encode, _ACCESS_KEY, algorithm=ALGORITHM)
 
 def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     now = datetime.utcnow()
     expire = now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "iat": now})
-    return jwt.encode(to_encode, REFRESH_SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, _REFRESH_KEY, algorithm=ALGORITHM)
 
-def verify_access_token(token: str):
+def _decode_access_token(token: str):
     try:
-        payload =jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return jwt.decode(token, _ACCESS_KEY, algorithms=_ALGORITHMS)
     except ExpiredSignatureError:
         return {"error": "expired"}
     except JWTError:
         return None
+
+def verify_access_token(token: str):
+    payload = _decode_access_token(token)
+    if not payload or "error" in payload:
+        return payload
+    jti = payload.get("jti")
+    if jti and denylist.contains(jti):
+        return {"error": "revoked"}
+    if denylist.user_revoked(payload.get("user_id"), payload.get("iat", 0)):
+        return {"error": "revoked"}
+    return payload
+
+def verify_access_tokens(tokens: List[str]) -> list:
+    """verify_access_token for a batch, with one denylist lookup per concern."""
+    payloads = [_decode_access_token(token) for token in tokens]
+    valid = [p for p in payloads if p and "error" not in p]
+    revoked_jtis = denylist.contains_many(p["jti"] for p in valid if p.get("jti"))
+    revoked_users = denylist.revoked_users(p["user_id"] for p in valid if p.get("user_id") is not None)
+    results = []
+    for payload in payloads:
+        if payload and "error" not in payload and (
+            payload.get("jti") in revoked_jtis
+            or payload.get("iat", 0) < revoked_users.get(payload.get("user_id"), 0)
+        ):
+            payload = {"error": "revoked"}
+        results.append(payload)
+    return results
     
 def verify_refresh_token(token: str):
     try:
-        payload =jwt.decode(token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
+        payload =jwt.decode(token, _REFRESH_KEY, algorithms=_ALGORITHMS)
         return payload
     except ExpiredSignatureError:
         return {"error": "expired"}
     except JWTError:
         return None
+
+def revoke_access_token(payload: dict) -> None:
+    """Denylists a verified access token until its exp (tokens without jti are ignored)."""
+    jti = payload.get("jti")
+    if jti and payload.get("exp"):
+        denylist.add(jti, int(payload["exp"]))
+
+def revoke_user_access_tokens(user_id: int) -> None:
+    """Rejects every access token issued to the user up to now, e.g. on deactivation."""
+    now = time.time()
+    # Tokens issued before now are all expired by then
+    denylist.revoke_user(user_id, now, int(now) + ACCESS_TOKEN_EXPIRE_MINUTES * 60 + 1)
+
+def clear_user_revocation(user_id: int) -> None:
+    """Drops the user's revocation on reactivation, so their next login is accepted."""
+    denylist.clear_user(user_id)
+
+def create_email_verification_token(user_id: int, email: str) -> str:
+    """Stateless signed token for a verification link; bound to the current email."""
+    now = datetime.utcnow()
+    to_encode = {
+        "user_id": user_id,
+        "email": email,
+        "purpose": "verify_email",
+        "exp": now + timedelta(hours=EMAIL_VERIFICATION_EXPIRE_HOURS),
+        "iat": now,
+    }
+    return jwt.encode(to_encode, _EMAIL_VERIFICATION_KEY, algorithm=ALGORITHM)
+
+def verify_email_verification_token(token: str):
+    try:
+        payload = jwt.decode(token, _EMAIL_VERIFICATION_KEY, algorithms=_ALGORITHMS)
+    except ExpiredSignatureError:
+        return {"error": "expired"}
+    except JWTError:
+        return None
+    if payload.get("purpose") != "verify_email":
+        return None
+    return payload
@@ -0,0 +1,43 @@
+"""
+Role -> permission registry.
+
+Each permission is one bit; a role's permissions are compiled into an int
+bitmask that is embedded in access tokens ("perms" claim), so route checks
+are a single AND with no database access.
+"""
+from enum import IntFlag
+from typing import Optional
+
+
+class Permission(IntFlag):
+    READ_PROFILE = 1 << 0
+    UPLOAD_FILES = 1 << 1
+    READ_USERS = 1 << 2
+    DELETE_USERS = 1 << 3
+    VIEW_STATS = 1 << 4
+    VIEW_AUDIT = 1 << 5
+
+
+USER_PERMISSIONS = Permission.READ_PROFILE | Permission.UPLOAD_FILES
+
+ADMIN_PERMISSIONS = (
+    USER_PERMISSIONS
+    | Permission.READ_USERS
+    | Permission.DELETE_USERS
+    | Permission.VIEW_STATS
+    | Permission.VIEW_AUDIT
+)
+
+ROLE_PERMISSIONS = {
+    "user": USER_PERMISSIONS,
+    "admin": ADMIN_PERMISSIONS,
+}
+
+
+def permissions_for_role(role: Optional[str]) -> int:
+    """Bitmask for a role; unknown roles get no permissions."""
+    return int(ROLE_PERMISSIONS.get(role, 0))
+
+
+def has_permissions(mask: int, required: int) -> bool:
+    return mask & required == required
@@ -0,0 +1,203 @@
+"""
+Denylist of revoked access tokens, keyed by the token's jti claim.
+
+Entries carry the token's exp and disappear once it passes, so memory is
+bounded by the number of revoked tokens that are still unexpired. A check
+is one hash lookup (memory) or one primary-key lookup (shared SQLite file);
+`contains_many` and `revoked_users` check a whole batch at once (one query
+each on SQLite, per chunk of IN_BATCH keys).
+
+Revoking all of a user's tokens at once (deactivation) stores a per-user
+"not before" time instead: tokens issued before it are rejected until the
+last of them would have expired, or until the user is reactivated.
+"""
+import heapq
+import itertools
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from app.config import TOKEN_DENYLIST_PATH
+
+Key = Union[bytes, str]
+
+# Keys per IN (...) query, well under SQLite's bound-parameter limit
+IN_BATCH = 500
+
+
+def _compact(jti: str) -> Key:
+    """uuid4 hex jtis are stored as 16 raw bytes instead of a 32-char str."""
+    try:
+        return uuid.UUID(hex=jti).bytes
+    except (ValueError, AttributeError, TypeError):
+        return jti
+
+
+class MemoryDenylist:
+    def __init__(self):
+        self._entries: Dict[Key, int] = {}
+        # (exp, seq, key): seq breaks exp ties, as bytes and str keys don't compare
+        self._expiry_heap: List[Tuple[int, int, Key]] = []
+        self._seq = itertools.count()
+        # user_id -> (not_before, until)
+        self._users: Dict[int, Tuple[float, int]] = {}
+        self._user_heap: List[Tuple[int, int]] = []
+        self._lock = threading.Lock()
+
+    def add(self, jti: str, exp: int) -> None:
+        key = _compact(jti)
+        with self._lock:
+            self._prune(time.time())
+            self._entries[key] = exp
+            heapq.heappush(self._expiry_heap, (exp, next(self._seq), key))
+
+    def contains(self, jti: str) -> bool:
+        exp = self._entries.get(_compact(jti))
+        return exp is not None and exp > time.time()
+
+    def contains_many(self, jtis: Iterable[str]) -> Set[str]:
+        """The revoked ones among `jtis`."""
+        return {jti for jti in jtis if self.contains(jti)}
+
+    def revoke_user(self, user_id: int, not_before: float, until: int) -> None:
+        with self._lock:
+            self._prune(time.time())
+            self._users[user_id] = (not_before, until)
+            heapq.heappush(self._user_heap, (until, user_id))
+
+    def clear_user(self, user_id: int) -> None:
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def user_revoked(self, user_id: int, issued_at: float) -> bool:
+        entry = self._users.get(user_id)
+        return entry is not None and entry[1] > time.time() and issued_at < entry[0]
+
+    def revoked_users(self, user_ids: Iterable[int]) -> Dict[int, float]:
+        """user_id -> not_before for those of `user_ids` with a live revocation."""
+        now = time.time()
+        return {
+            user_id: entry[0]
+            for user_id, entry in ((u, self._users.get(u)) for u in set(user_ids))
+            if entry is not None and entry[1] > now
+        }
+
+    def _prune(self, now: float) -> None:
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            exp, _, key = heapq.heappop(heap)
+            if self._entries.get(key) == exp:
+                del self._entries[key]
+        heap = self._user_heap
+        while heap and heap[0][0] <= now:
+            until, user_id = heapq.heappop(heap)
+            if self._users.get(user_id, (0, None))[1] == until:
+                del self._users[user_id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def reset_after_fork(self) -> None:
+        pass
+
+
+class SqliteDenylist:
+    """Denylist in a local SQLite file, shared by all workers on the host."""
+
+    def __init__(self, path: str, prune_every: int = 256):
+        self.path = path
+        self.prune_every = prune_every
+        self._adds = 0
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS revoked_tokens "
+            "(jti BLOB PRIMARY KEY, exp INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS revoked_users "
+            "(user_id INTEGER PRIMARY KEY, not_before REAL NOT NULL, until INTEGER NOT NULL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, jti: str, exp: int) -> None:
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO revoked_tokens (jti, exp) VALUES (?, ?)", (_compact(jti), exp))
+        self._adds += 1
+        if self._adds % self.prune_every == 0:
+            conn.execute("DELETE FROM revoked_tokens WHERE exp <= ?", (int(time.time()),))
+            conn.execute("DELETE FROM revoked_users WHERE until <= ?", (int(time.time()),))
+
+    def contains(self, jti: str) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM revoked_tokens WHERE jti = ? AND exp > ?", (_compact(jti), int(time.time()))
+        ).fetchone()
+        return row is not None
+
+    def contains_many(self, jtis: Iterable[str]) -> Set[str]:
+        """The revoked ones among `jtis`."""
+        by_key = {_compact(jti): jti for jti in jtis}
+        keys, now, revoked = list(by_key), int(time.time()), set()
+        for start in range(0, len(keys), IN_BATCH):
+            chunk = keys[start:start + IN_BATCH]
+            rows = self._conn().execute(
+                f"SELECT jti FROM revoked_tokens WHERE exp > ? AND jti IN ({', '.join('?' * len(chunk))})",
+                (now, *chunk),
+            )
+            revoked.update(by_key[key] for key, in rows)
+        return revoked
+
+    def revoke_user(self, user_id: int, not_before: float, until: int) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO revoked_users (user_id, not_before, until) VALUES (?, ?, ?)",
+            (user_id, not_before, until),
+        )
+
+    def clear_user(self, user_id: int) -> None:
+        self._conn().execute("DELETE FROM revoked_users WHERE user_id = ?", (user_id,))
+
+    def user_revoked(self, user_id: int, issued_at: float) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM revoked_users WHERE user_id = ? AND until > ? AND not_before > ?",
+            (user_id, int(time.time()), issued_at),
+        ).fetchone()
+        return row is not None
+
+    def revoked_users(self, user_ids: Iterable[int]) -> Dict[int, float]:
+        """user_id -> not_before for those of `user_ids` with a live revocation."""
+        ids, now, revoked = list(set(user_ids)), int(time.time()), {}
+        for start in range(0, len(ids), IN_BATCH):
+            chunk = ids[start:start + IN_BATCH]
+            rows = self._conn().execute(
+                f"SELECT user_id, not_before FROM revoked_users WHERE until > ? "
+                f"AND user_id IN ({', '.join('?' * len(chunk))})",
+                (now, *chunk),
+            )
+            revoked.update(rows)
+        return revoked
+
+    def reset_after_fork(self) -> None:
+        # SQLite connections must not be shared across fork
+        self._local = threading.local()
+
+    def __len__(self) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM revoked_tokens WHERE exp > ?", (int(time.time()),)
+        ).fetchone()[0]
+
+
+def build_denylist(path: Optional[str] = None):
+    return SqliteDenylist(path) if path else MemoryDenylist()
+
+
+denylist = build_denylist(TOKEN_DENYLIST_PATH)
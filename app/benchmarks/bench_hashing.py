@@ -0,0 +1,31 @@
+"""
+Password hashing benchmark.
+
+Usage:
+    python -m app.benchmarks.bench_hashing
+
+Times hash_password / verify_password with the configured scheme and cost,
+and bcrypt at a few fixed rounds for comparison.
+"""
+from passlib.hash import bcrypt
+
+from app.benchmarks.timing import time_call, report
+from app.config import PASSWORD_HASH_SCHEME, BCRYPT_ROUNDS
+from app.utils.hash import hash_password, verify_password
+
+PASSWORD = "benchmark-password"
+
+
+def main() -> None:
+    print(f"scheme={PASSWORD_HASH_SCHEME} bcrypt_rounds={BCRYPT_ROUNDS}")
+    hashed = hash_password(PASSWORD)
+    report("hash_password", time_call(lambda: hash_password(PASSWORD), number=3, repeat=3))
+    report("verify_password", time_call(lambda: verify_password(PASSWORD, hashed), number=3, repeat=3))
+
+    for rounds in (10, 11, 12, 13):
+        hasher = bcrypt.using(rounds=rounds)
+        report(f"bcrypt rounds={rounds}", time_call(lambda: hasher.hash(PASSWORD), number=2, repeat=3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+SQLite profile benchmark under concurrent login / refresh load.
+
+Usage:
+    python -m app.benchmarks.bench_sqlite_profile [--threads 16] [--ops 100]
+
+Runs the database side of /auth/login (user lookup, a 5 ms pause standing
+in for password hashing, refresh-token insert, commit) and /auth/refresh
+(token and user lookups) from many threads against a fresh SQLite file.
+Two setups are compared: the plain engine ("default") and the tuned
+profile from app/db_sqlite.py. Prints throughput, latency percentiles and
+how many operations failed with "database is locked".
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db_base import Base
+from app.db_sqlite import SQLiteRoutingSession, create_reader_engine, create_writer_engine
+from app.models.refresh_token_model import RefreshToken
+from app.models.user_model import User
+from app.repositories import user_repository
+import app.database  # noqa: F401 (registers every model on Base.metadata)
+
+USERS = 200
+HASH_SECONDS = 0.005
+
+
+def default_sessions(url):
+    return sessionmaker(bind=create_engine(url), autoflush=False)
+
+
+def tuned_sessions(url):
+    return sessionmaker(
+        class_=SQLiteRoutingSession,
+        bind=create_writer_engine(url),
+        reader=create_reader_engine(url),
+        autoflush=False,
+    )
+
+
+def seed(session_factory):
+    db = session_factory()
+    try:
+        db.add_all(User(email=f"user{i}@example.com", hashed_password="x", role="user") for i in range(USERS))
+        db.commit()
+        tokens = []
+        for i in range(USERS):
+            token = RefreshToken(token=uuid4().hex, user_id=i + 1, expires_at=datetime.utcnow() + timedelta(days=7))
+            db.add(token)
+            tokens.append(token.token)
+        db.commit()
+        return tokens
+    finally:
+        db.close()
+
+
+def _hash():
+    # bcrypt releases the GIL while hashing, so a sleep models it well
+    time.sleep(HASH_SECONDS)
+
+
+def login(session_factory, i):
+    db = session_factory()
+    try:
+        user = user_repository.get_user_by_email(db, f"user{i % USERS}@example.com")
+        _hash()
+        user.last_login_at = datetime.utcnow()
+        db.add(RefreshToken(token=uuid4().hex, user_id=user.id, expires_at=datetime.utcnow() + timedelta(days=7)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def refresh(session_factory, token):
+    db = session_factory()
+    try:
+        row = db.query(RefreshToken).filter(RefreshToken.token == token).first()
+        user_repository.get_user_by_id(db, row.user_id)
+    finally:
+        db.close()
+
+
+def run(name, session_factory, threads, ops):
+    tokens = seed(session_factory)
+    latencies, locked = [], [0]
+    lock = threading.Lock()
+
+    def worker(n):
+        for k in range(ops):
+            start = time.perf_counter()
+            try:
+                # Two refreshes per login, roughly the ratio of a busy API
+                if k % 3 == 0:
+                    login(session_factory, n * ops + k)
+                else:
+                    refresh(session_factory, tokens[(n * ops + k) % len(tokens)])
+            except OperationalError as exc:
+                if "locked" not in str(exc):
+                    raise
+                with lock:
+                    locked[0] += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000 if latencies else float("nan")
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float("nan")
+    print(
+        f"{name:<8} {len(latencies) / elapsed:>8.0f} ops/s   p50 {p50:>7.1f} ms   "
+        f"p99 {p99:>7.1f} ms   locked errors {locked[0]}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare SQLite profiles under concurrent auth load.")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=100, help="Operations per thread")
+    args = parser.parse_args()
+
+    print(f"threads={args.threads} ops/thread={args.ops} (1 login : 2 refresh)")
+    for name, factory in (("default", default_sessions), ("tuned", tuned_sessions)):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            session_factory = factory(url)
+            Base.metadata.create_all(bind=session_factory.kw["bind"])
+            run(name, session_factory, args.threads, args.ops)
+
+
+if __name__ == "__main__":
+    main()
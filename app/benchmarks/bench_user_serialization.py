@@ -0,0 +1,78 @@
+"""
+User list serialization benchmark (100-row page).
+
+Usage:
+    python -m app.benchmarks.bench_user_serialization
+
+Compares the default FastAPI path (load full User objects, validate them
+through UserResponse, then encode) with the lean path (select response
+columns, dump through a prebuilt TypeAdapter) on in-memory SQLite.
+"""
+import json
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.benchmarks.timing import time_call, report
+from app.db_base import Base
+from app.models.user_model import User
+from app.models.refresh_token_model import RefreshToken  # noqa: F401 (mapper registry)
+from app.models.file_model import FileUpload  # noqa: F401
+from app.schemas.user_schema import UserResponse
+from app.utils.serialization import USER_RESPONSE_COLUMNS, users_json
+
+PAGE_SIZE = 100
+
+response_list_adapter = TypeAdapter(list[UserResponse])
+
+
+def make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all(
+        User(email=f"user{i}@example.com", full_name=f"User {i}", hashed_password="x" * 60, role="user", is_active=True)
+        for i in range(PAGE_SIZE)
+    )
+    db.commit()
+    return db
+
+
+def orm_path(db) -> bytes:
+    users = db.query(User).order_by(User.id.desc()).limit(PAGE_SIZE).all()
+    validated = response_list_adapter.validate_python(users, from_attributes=True)
+    return json.dumps(response_list_adapter.dump_python(validated, mode="json")).encode()
+
+
+def lean_path(db) -> bytes:
+    rows = db.query(*USER_RESPONSE_COLUMNS).order_by(User.id.desc()).limit(PAGE_SIZE).all()
+    return users_json(rows).body
+
+
+def main() -> None:
+    db = make_session()
+    assert json.loads(orm_path(db)) == json.loads(lean_path(db))
+
+    def orm_full():
+        db.expunge_all()
+        orm_path(db)
+
+    def lean_full():
+        db.expunge_all()
+        lean_path(db)
+
+    baseline = time_call(orm_full)
+    report("ORM + UserResponse validation (100 rows)", baseline)
+    report("columns + TypeAdapter dump (100 rows)", time_call(lean_full), baseline)
+
+    users = db.query(User).limit(PAGE_SIZE).all()
+    rows = db.query(*USER_RESPONSE_COLUMNS).limit(PAGE_SIZE).all()
+    baseline = time_call(lambda: json.dumps(response_list_adapter.dump_python(
+        response_list_adapter.validate_python(users, from_attributes=True), mode="json")))
+    report("serialize only: validate + json.dumps", baseline)
+    report("serialize only: TypeAdapter.dump_json", time_call(lambda: users_json(rows)), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Performance budgets for hot auth primitives.
+
+Usage:
+    python -m app.benchmarks.suite                    # print results as JSON
+    python -m app.benchmarks.suite --check            # compare with the baseline, exit 1 on regression
+    python -m app.benchmarks.suite --update-baseline  # re-record app/benchmarks/baseline.json
+
+app/tests/test_perf_budgets.py runs the same check under pytest. By default
+it skips the bcrypt-bound hashing benchmarks and doubles every tolerance,
+so only real regressions fail on a busy laptop; RUN_PERF_BUDGETS=1 runs the
+full suite at the recorded tolerances.
+
+Every benchmark runs against in-memory SQLite and the configured hashing
+scheme. Raw timings depend on the machine, so each timing is also stored
+divided by a fixed pure-Python reference workload timed in the same run
+("relative"). Budgets compare relative timings: the baseline recorded on a
+laptop still holds on a slower CI runner. A benchmark fails its budget when
+its relative time exceeds the baseline by more than its tolerance factor.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.benchmarks.timing import time_call
+from app.auth.jwt_handler import (
+    create_access_token,
+    create_refresh_token,
+    verify_access_token,
+    verify_refresh_token,
+)
+from app.config import PASSWORD_HASH_SCHEME, BCRYPT_ROUNDS
+from app.db_base import Base
+from app.dependencies import get_current_user, get_token_payload
+from app.models.user_model import User
+from app.repositories import user_repository
+from app.utils.hash import hash_password, verify_password
+from app.utils.serialization import user_json, users_json
+import app.database  # noqa: F401 (registers every model on Base.metadata)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+DEFAULT_TOLERANCE = 1.5
+
+# Dominated by the configured hashing cost (hundreds of ms per call)
+HASHING_BENCHMARKS = ("hash_password", "verify_password")
+
+PASSWORD = "benchmark-password"
+
+
+def reference_workload() -> None:
+    """Fixed pure-Python work used as this machine's unit of speed."""
+    table = {}
+    for i in range(2000):
+        table[i % 97] = table.get(i % 97, 0) + i * i
+    sorted(table.items())
+
+
+def _session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    db.add_all(
+        User(email=f"user{i}@example.com", full_name=f"User {i}", hashed_password="x", role="user", is_active=True)
+        for i in range(100)
+    )
+    db.commit()
+    return db
+
+
+def build_benchmarks(include_hashing: bool = True) -> List[Tuple[str, Callable[[], object], int, float]]:
+    """(name, fn, calls per round, tolerance) for every budgeted primitive."""
+    db = _session()
+    user = user_repository.get_user_by_id(db, 1)
+    rows = user_repository.list_user_rows(db, limit=100)
+
+    hashed = hash_password(PASSWORD)
+    access = create_access_token({"user_id": user.id, "role": user.role})
+    refresh = create_refresh_token({"user_id": user.id})
+
+    def current_user_chain():
+        payload = get_token_payload(access)
+        return get_current_user(payload, db)
+
+    benchmarks = [
+        # Hashing runs in C, so its ratio to the Python reference varies more
+        # between machines; deliberate cost changes are caught by "hashing"
+        ("hash_password", lambda: hash_password(PASSWORD), 1, 2.0),
+        ("verify_password", lambda: verify_password(PASSWORD, hashed), 1, 2.0),
+        ("create_access_token", lambda: create_access_token({"user_id": user.id, "role": user.role}), 200, DEFAULT_TOLERANCE),
+        ("verify_access_token", lambda: verify_access_token(access), 200, DEFAULT_TOLERANCE),
+        ("verify_refresh_token", lambda: verify_refresh_token(refresh), 200, DEFAULT_TOLERANCE),
+        ("user_json 1 row", lambda: user_json(user), 500, DEFAULT_TOLERANCE),
+        ("users_json 100 rows", lambda: users_json(rows), 100, DEFAULT_TOLERANCE),
+        ("get_current_user chain", current_user_chain, 200, DEFAULT_TOLERANCE),
+        ("list_user_rows query", lambda: user_repository.list_user_rows(db, "user1", "user", "desc", 0, 10), 200, DEFAULT_TOLERANCE),
+    ]
+    if not include_hashing:
+        benchmarks = [b for b in benchmarks if b[0] not in HASHING_BENCHMARKS]
+    return benchmarks
+
+
+def hashing_settings() -> Dict[str, object]:
+    return {"scheme": PASSWORD_HASH_SCHEME, "bcrypt_rounds": BCRYPT_ROUNDS}
+
+
+def run_suite(include_hashing: bool = True) -> Dict[str, object]:
+    """Times every benchmark; returns a JSON-serializable result document."""
+    results = {}
+    references = []
+    for name, fn, number, tolerance in build_benchmarks(include_hashing):
+        # The reference is timed right next to each benchmark, so a machine
+        # that speeds up or slows down during the run scales both alike
+        reference_us = time_call(reference_workload, number=50)
+        per_call_us = time_call(fn, number=number, repeat=3 if number == 1 else 7)
+        reference_us = min(reference_us, time_call(reference_workload, number=50))
+        references.append(reference_us)
+        results[name] = {
+            "us": round(per_call_us, 2),
+            "relative": round(per_call_us / reference_us, 4),
+            "tolerance": tolerance,
+        }
+    return {"reference_us": round(min(references), 2), "hashing": hashing_settings(), "benchmarks": results}
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, object]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results: Dict[str, object], baseline: Dict[str, object], headroom: float = 1.0) -> Tuple[List[str], List[str]]:
+    """
+    Returns (regressions, skipped) as human-readable lines. `headroom`
+    multiplies every benchmark's tolerance.
+    """
+    regressions, skipped = [], []
+    same_hashing = results["hashing"] == baseline["hashing"]
+    for name, base in baseline["benchmarks"].items():
+        current = results["benchmarks"].get(name)
+        if current is None:
+            skipped.append(f"{name}: not run")
+            continue
+        if name in HASHING_BENCHMARKS and not same_hashing:
+            skipped.append(f"{name}: hashing settings differ from the baseline")
+            continue
+        ratio = current["relative"] / base["relative"]
+        budget = base["tolerance"] * headroom
+        if ratio > budget:
+            regressions.append(
+                f"{name}: x{ratio:.2f} slower than baseline "
+                f"({current['us']:.1f} us here, budget x{budget:g})"
+            )
+    return regressions, skipped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the performance budget benchmarks.")
+    parser.add_argument("--check", action="store_true", help="Compare with the baseline; exit 1 on regression")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = run_suite()
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"[ok] Baseline written to {BASELINE_PATH}", file=sys.stderr)
+
+    if args.check:
+        regressions, skipped = compare(results, load_baseline())
+        for line in skipped:
+            print(f"[skip] {line}", file=sys.stderr)
+        for line in regressions:
+            print(f"[fail] {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import time
+from typing import Callable
+
+
+def time_call(fn: Callable[[], object], number: int = 100, repeat: int = 5) -> float:
+    """
+    Calls `fn` `number` times per round for `repeat` rounds and returns the
+    best per-call time in microseconds (best-of-N filters scheduler noise).
+    """
+    fn()  # warm-up
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number * 1_000_000)
+    return min(rounds)
+
+
+def report(name: str, per_call_us: float, baseline_us: float | None = None) -> None:
+    """Prints one benchmark line, with a speed-up factor when a baseline is given."""
+    line = f"{name:<45} {per_call_us:>12.1f} us"
+    if baseline_us:
+        line += f"   x{baseline_us / per_call_us:.2f}"
+    print(line)
+
@@ -0,0 +1,59 @@
+# calibrate_hash.py
+"""
+Ops helper: measure password hashing time on this host and pick a cost.
+
+Usage:
+    python -m app.calibrate_hash --target-ms 250
+
+Times bcrypt at increasing rounds and prints the highest rounds whose median
+hash time stays under the target. Run it on the production hardware and put
+the result in BCRYPT_ROUNDS. Existing hashes are upgraded on the next login.
+"""
+import argparse
+import statistics
+import time
+
+from passlib.hash import bcrypt
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+def measure_bcrypt_ms(rounds: int, samples: int = 3) -> float:
+    """Median wall time (ms) of one bcrypt hash at the given rounds."""
+    hasher = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def calibrate_bcrypt_rounds(target_ms: float, samples: int = 3) -> tuple[int, dict[int, float]]:
+    """
+    Returns (best_rounds, {rounds: median_ms}). Each extra round doubles the
+    cost, so measuring stops as soon as the target is exceeded.
+    """
+    results: dict[int, float] = {}
+    best = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = measure_bcrypt_ms(rounds, samples)
+        results[rounds] = elapsed
+        if elapsed > target_ms:
+            break
+        best = rounds
+    return best, results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pick bcrypt rounds for a target hashing latency.")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Target time per hash in ms (default 250)")
+    parser.add_argument("--samples", type=int, default=3, help="Hashes to time per rounds value (default 3)")
+    args = parser.parse_args()
+
+    best, results = calibrate_bcrypt_rounds(args.target_ms, args.samples)
+    print("rounds  median_ms")
+    for rounds, elapsed in results.items():
+        print(f"{rounds:>6}  {elapsed:>9.1f}")
+    print()
+    if results[MIN_ROUNDS] > args.target_ms:
+        print(f"[warn] Even {MIN_ROUNDS} rounds exceeds {args.target_ms:.0f} ms on this host.")
+    print(f"BCRYPT_ROUNDS={best}")
@@ -10,9 +10,138 @@ REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
 
 ALGORITHM = "HS256"
 
+# Comma-separated keys that let internal services (e.g. the API gateway)
+# call service endpoints such as POST /auth/introspect via X-API-Key
+SERVICE_API_KEYS = [key.strip() for key in os.getenv("SERVICE_API_KEYS", "").split(",") if key.strip()]
+INTROSPECT_MAX_TOKENS = int(os.getenv("INTROSPECT_MAX_TOKENS", 500))
+
+# Revoked access tokens (by jti) are kept in process memory until they
+# expire. Set a local file path to share the denylist between the workers
+# on one host (SQLite file).
+TOKEN_DENYLIST_PATH = os.getenv("TOKEN_DENYLIST_PATH") or None
+
+# Login circuit breaker: failed logins per account and per client subnet
+# are counted in decaying sketches (counts halve every half-life). While a
+# count is at or above its threshold, logins are rejected before any
+# password hashing, for a time that grows with the number of failures.
+LOGIN_GUARD_ACCOUNT_THRESHOLD = int(os.getenv("LOGIN_GUARD_ACCOUNT_THRESHOLD", 5))
+LOGIN_GUARD_SUBNET_THRESHOLD = int(os.getenv("LOGIN_GUARD_SUBNET_THRESHOLD", 50))
+LOGIN_GUARD_HALF_LIFE_SECONDS = int(os.getenv("LOGIN_GUARD_HALF_LIFE_SECONDS", 300))
+LOGIN_GUARD_MAX_LOCKOUT_SECONDS = int(os.getenv("LOGIN_GUARD_MAX_LOCKOUT_SECONDS", 3600))
+
+# Read replicas (optional): comma-separated URLs used by read-only endpoints.
+# Replicas are health-checked at most every REPLICA_HEALTH_CHECK_SECONDS and
+# skipped while down. After a user's own write, their reads stay on the
+# primary for READ_YOUR_WRITES_SECONDS so they never see stale data.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_HEALTH_CHECK_SECONDS = int(os.getenv("REPLICA_HEALTH_CHECK_SECONDS", 10))
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+# SQLite profile, used when DATABASE_URL is a SQLite file. "tuned" uses WAL,
+# synchronous=NORMAL, mmap and busy_timeout, a single writer connection and
+# a read pool (see app/db_sqlite.py); "default" is the plain engine.
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "tuned")
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", 8))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 32768))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_MAINTENANCE_SECONDS = float(os.getenv("SQLITE_MAINTENANCE_SECONDS", 300))
+
+# How long a worker may answer /users/me revalidations (304) from its
+# in-memory copy of the user's validators without re-reading the row.
+# Only the worker that changed a user evicts its copy, so app.server turns
+# this off (0) with several workers unless it is set explicitly.
+PRINCIPAL_CACHE_SECONDS = int(os.getenv("PRINCIPAL_CACHE_SECONDS", 30))
+
+# Password hashing
+# Scheme used for new hashes ("bcrypt" or "argon2"). Hashes made with the
+# other scheme stay verifiable and are upgraded on the next successful login.
+# argon2 needs the optional argon2-cffi package.
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+# Pick a value for your hardware with: python -m app.calibrate_hash
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 2))
+ARGON2_MEMORY_COST_KB = int(os.getenv("ARGON2_MEMORY_COST_KB", 19456))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 1))
+
+# Email verification
+# Links carry a stateless signed token (no lookup table). The signing key is
+# derived from SECRET_KEY unless set, and differs from the access-token key.
+APP_BASE_URL = os.getenv("APP_BASE_URL", "http://127.0.0.1:8000")
+EMAIL_VERIFICATION_SECRET = os.getenv("EMAIL_VERIFICATION_SECRET")
+EMAIL_VERIFICATION_EXPIRE_HOURS = int(os.getenv("EMAIL_VERIFICATION_EXPIRE_HOURS", 24))
+
+# Outgoing mail is queued in the email_outbox table and sent in batches by a
+# background worker over a reused SMTP connection. Without SMTP_HOST the
+# worker is not started and messages stay queued.
+SMTP_HOST = os.getenv("SMTP_HOST") or None
+SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME") or None
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD") or None
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+EMAIL_FROM = os.getenv("EMAIL_FROM", "no-reply@tokensafe.local")
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", 50))
+EMAIL_OUTBOX_POLL_SECONDS = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", 2))
+
+# Admin audit log: events are queued in memory and written in batches by a
+# background thread. When the queue is full, callers wait up to
+# AUDIT_ENQUEUE_TIMEOUT_SECONDS and then write their event synchronously.
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", 10000))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 200))
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", 1))
+AUDIT_ENQUEUE_TIMEOUT_SECONDS = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT_SECONDS", 0.05))
+
+# Deactivated (soft-deleted) users are hard-deleted USER_PURGE_AFTER_DAYS
+# after deactivation, USER_PURGE_BATCH_SIZE at a time. 0 days disables it.
+USER_PURGE_AFTER_DAYS = int(os.getenv("USER_PURGE_AFTER_DAYS", 30))
+USER_PURGE_BATCH_SIZE = int(os.getenv("USER_PURGE_BATCH_SIZE", 500))
+USER_PURGE_INTERVAL_SECONDS = float(os.getenv("USER_PURGE_INTERVAL_SECONDS", 3600))
+
+# File storage. Large files use resumable uploads (/files/uploads): the
+# server dictates UPLOAD_CHUNK_SIZE, and sessions not completed within
+# UPLOAD_SESSION_TTL_HOURS are garbage-collected.
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024))
+UPLOAD_MAX_SIZE = int(os.getenv("UPLOAD_MAX_SIZE", 10 * 1024 ** 3))
+UPLOAD_SESSION_TTL_HOURS = float(os.getenv("UPLOAD_SESSION_TTL_HOURS", 24))
+UPLOAD_GC_INTERVAL_SECONDS = float(os.getenv("UPLOAD_GC_INTERVAL_SECONDS", 900))
+
+# Activity rollups (GET /admin/stats/timeseries). Hourly counters older
+# than ACTIVITY_HOURLY_RETENTION_DAYS are dropped (0 keeps them); daily
+# counters are kept forever.
+ACTIVITY_HOURLY_RETENTION_DAYS = int(os.getenv("ACTIVITY_HOURLY_RETENTION_DAYS", 90))
+ACTIVITY_GC_INTERVAL_SECONDS = float(os.getenv("ACTIVITY_GC_INTERVAL_SECONDS", 3600))
+
+# Server launcher (python -m app.server)
+# WEB_CONCURRENCY overrides the worker count; otherwise it is sized from the
+# usable CPUs, capped by available memory / WORKER_MEMORY_MB.
+PORT = int(os.getenv("PORT", 8000))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 0))
+WORKER_MEMORY_MB = int(os.getenv("WORKER_MEMORY_MB", 150))
+KEEPALIVE_SECONDS = int(os.getenv("KEEPALIVE_SECONDS", 5))
+BACKLOG = int(os.getenv("BACKLOG", 2048))
+# Recycle each worker after about this many requests (0 disables)
+MAX_REQUESTS = int(os.getenv("MAX_REQUESTS", 10000))
+MAX_REQUESTS_JITTER = int(os.getenv("MAX_REQUESTS_JITTER", 1000))
+GRACEFUL_TIMEOUT_SECONDS = int(os.getenv("GRACEFUL_TIMEOUT_SECONDS", 30))
+# Threads available to sync (def) handlers and dependencies, per worker
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", 40))
+# Optional separate thread pools per router, as "<router prefix>=<threads>"
+# pairs, e.g. "auth=16,admin=8,files=8". Unlisted routers share the default.
+THREADPOOL_POOLS = {
+    name.strip(): int(size)
+    for name, size in (pair.split("=", 1) for pair in os.getenv("THREADPOOL_POOLS", "").split(",") if "=" in pair)
+}
+
 # Safety check (VERY IMPORTANT)
 if not SECRET_KEY or not REFRESH_SECRET_KEY:
     raise RuntimeError("JWT secrets are not set")
 
+if SQLITE_PROFILE not in ("tuned", "default"):
+    raise RuntimeError("SQLITE_PROFILE must be 'tuned' or 'default'")
+
+if PASSWORD_HASH_SCHEME not in ("bcrypt", "argon2"):
+    raise RuntimeError("PASSWORD_HASH_SCHEME must be 'bcrypt' or 'argon2'")
+
 # TODO:
 # Refactor this config to use Pydantic BaseSettings after project completion
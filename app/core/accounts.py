@@ -0,0 +1,28 @@
+"""
+Account deactivation and reactivation shared by the admin and user routers.
+
+Deactivating is more than setting users.deleted_at: routes authorize from
+the access token alone, so the user's refresh tokens are revoked and their
+outstanding access tokens are rejected as well, right after the commit.
+Every route that deactivates a user must go through `deactivate_user`.
+"""
+from sqlalchemy.orm import Session
+
+from app.auth.jwt_handler import clear_user_revocation, revoke_user_access_tokens
+from app.models.user_model import User
+from app.repositories import token_repository, user_repository
+
+
+def deactivate_user(db: Session, user: User) -> None:
+    """Soft-deletes the user and revokes all their tokens. Commits."""
+    user_repository.soft_delete_user(user)
+    token_repository.revoke_user_tokens(db, user.id)
+    db.commit()
+    revoke_user_access_tokens(user.id)
+
+
+def reactivate_user(db: Session, user: User) -> None:
+    """Restores the user and lets tokens issued from now on through. Commits."""
+    user_repository.restore_user(user)
+    db.commit()
+    clear_user_revocation(user.id)
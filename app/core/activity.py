@@ -0,0 +1,199 @@
+"""
+Incremental activity rollups for admin trend charts.
+
+Request handlers call `record_activity` inside their own transaction, e.g.
+`record_activity(db, logins=1, user_id=user.id)`. It adds the counts to
+the current hour and day rows of activity_rollups with one multi-row
+upsert (INSERT ... ON CONFLICT DO UPDATE SET value = value + excluded.value),
+so counters commit or roll back together with the event they count, and
+GET /admin/stats/timeseries reads a few primary-key rows instead of
+scanning users, refresh_tokens or file_uploads.
+
+active_users counts distinct users per bucket. A user is marked in
+activity_active_users the first time they are seen in a bucket, and the
+counter only moves when that insert actually adds a row. Each worker also
+remembers who it has marked this hour, so a user's later requests in the
+same hour skip the database entirely. `ActivityCollector` deletes marks of
+closed buckets and hourly counters past their retention.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Literal, Optional, Set, Tuple, get_args
+
+from sqlalchemy import delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import ACTIVITY_HOURLY_RETENTION_DAYS, ACTIVITY_GC_INTERVAL_SECONDS
+from app.core.metrics import metrics
+from app.database import SessionLocal
+from app.models.activity_rollup_model import ActivityRollup, ActiveUserMark
+
+logger = logging.getLogger("app")
+
+Metric = Literal["registrations", "logins", "active_users", "uploads", "upload_bytes"]
+Bucket = Literal["hour", "day"]
+
+METRICS = get_args(Metric)
+
+BUCKETS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+
+def bucket_start(at: datetime, bucket: str) -> datetime:
+    """Start of the UTC hour or day containing `at`."""
+    if bucket == "hour":
+        return at.replace(minute=0, second=0, microsecond=0)
+    return at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def bucket_starts(start: datetime, end: datetime, bucket: str) -> Iterable[datetime]:
+    """Every bucket start from the bucket containing `start` up to `end` (exclusive)."""
+    current, step = bucket_start(start, bucket), BUCKETS[bucket]
+    while current < end:
+        yield current
+        current += step
+
+
+def _insert(db: Session):
+    # Both dialects spell the upsert the same way
+    dialect = db.get_bind().dialect.name
+    return postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+
+class _SeenThisHour:
+    """Users this worker has already marked active in the current hour."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hour: Optional[datetime] = None
+        self._users: Set[int] = set()
+
+    def add(self, hour: datetime, user_id: int) -> bool:
+        """True if the user was not seen yet this hour."""
+        with self._lock:
+            if hour != self._hour:
+                self._hour, self._users = hour, set()
+            if user_id in self._users:
+                return False
+            self._users.add(user_id)
+            return True
+
+
+_seen = _SeenThisHour()
+
+
+def _mark_active(db: Session, user_id: int, starts: Dict[str, datetime]) -> List[str]:
+    """Returns the buckets in which the user had not been counted yet."""
+    # Remembered before the caller commits: a rolled-back request can leave
+    # the user uncounted for the hour, which trend charts tolerate
+    if not _seen.add(starts["hour"], user_id):
+        return []
+    insert = _insert(db)
+    new = []
+    for bucket in ("hour", "day"):
+        stmt = insert(ActiveUserMark).values(
+            bucket=bucket, bucket_start=starts[bucket], user_id=user_id
+        ).on_conflict_do_nothing()
+        if db.execute(stmt).rowcount:
+            new.append(bucket)
+    return new
+
+
+def record_activity(db: Session, user_id: Optional[int] = None, at: Optional[datetime] = None, **counts: int) -> bool:
+    """
+    Adds `counts` (keyword per metric, e.g. uploads=1, upload_bytes=n) to
+    the hour and day rollups, and counts `user_id` as active. Runs in the
+    caller's transaction and does not commit. Returns True if it wrote.
+    """
+    at = at or datetime.utcnow()
+    starts = {bucket: bucket_start(at, bucket) for bucket in BUCKETS}
+
+    rows: List[Tuple[str, str, datetime, int]] = [
+        (metric, bucket, starts[bucket], value)
+        for metric, value in counts.items() if value
+        for bucket in BUCKETS
+    ]
+    if user_id is not None:
+        rows += [("active_users", bucket, starts[bucket], 1) for bucket in _mark_active(db, user_id, starts)]
+    if not rows:
+        return False
+
+    # Fixed row order, so concurrent upserts lock hot rows in the same order
+    rows.sort()
+    insert = _insert(db)
+    stmt = insert(ActivityRollup).values(
+        [{"metric": m, "bucket": b, "bucket_start": s, "value": v} for m, b, s, v in rows]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ActivityRollup.metric, ActivityRollup.bucket, ActivityRollup.bucket_start],
+        set_={"value": ActivityRollup.value + stmt.excluded.value},
+    )
+    db.execute(stmt)
+    return True
+
+
+class ActivityCollector:
+    """Deletes active-user marks of closed buckets and expired hourly rollups."""
+
+    def __init__(self, session_factory: sessionmaker, hourly_retention_days: int = 90, interval_seconds: float = 3600):
+        self.session_factory = session_factory
+        self.hourly_retention_days = hourly_retention_days
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """Returns how many rows were deleted."""
+        now = now or datetime.utcnow()
+        db = self.session_factory()
+        try:
+            removed = 0
+            for bucket, step in BUCKETS.items():
+                # Keep the previous bucket too: a request that started just
+                # before the boundary may still be marking it
+                cutoff = bucket_start(now, bucket) - step
+                removed += db.execute(
+                    delete(ActiveUserMark).where(
+                        ActiveUserMark.bucket == bucket, ActiveUserMark.bucket_start < cutoff
+                    )
+                ).rowcount
+            if self.hourly_retention_days:
+                removed += db.execute(
+                    delete(ActivityRollup).where(
+                        ActivityRollup.bucket == "hour",
+                        ActivityRollup.bucket_start < now - timedelta(days=self.hourly_retention_days),
+                    )
+                ).rowcount
+            db.commit()
+        finally:
+            db.close()
+        if removed:
+            metrics.inc("activity_rows_collected_total", removed)
+        return removed
+
+    # Background thread
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.error("Activity rollup collection failed", exc_info=True)
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="activity-gc", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+
+activity_collector = ActivityCollector(
+    SessionLocal,
+    hourly_retention_days=ACTIVITY_HOURLY_RETENTION_DAYS,
+    interval_seconds=ACTIVITY_GC_INTERVAL_SECONDS,
+)
@@ -0,0 +1,178 @@
+"""
+Admin audit log writer.
+
+Handlers call `audit_log.record(...)`, which only appends the event to a
+bounded in-memory queue. A background thread drains the queue and writes
+up to AUDIT_BATCH_SIZE events per multi-row INSERT, so admin requests do
+not pay for a second write in their own transaction.
+
+Backpressure: when the queue is full, `record` waits up to
+AUDIT_ENQUEUE_TIMEOUT_SECONDS for room and then writes the event itself.
+Slow storage therefore slows admin requests down instead of losing events.
+"""
+import json
+import logging
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from app.config import (
+    AUDIT_QUEUE_SIZE,
+    AUDIT_BATCH_SIZE,
+    AUDIT_FLUSH_SECONDS,
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS,
+)
+from app.core.metrics import metrics
+from app.database import engine
+from app.models.audit_log_model import AuditLog
+
+logger = logging.getLogger("app")
+
+
+def request_metadata(request: Optional[Request]) -> Dict[str, Optional[str]]:
+    if request is None:
+        return {"ip_address": None, "user_agent": None, "method": None, "path": None}
+    return {
+        "ip_address": request.client.host if request.client else None,
+        "user_agent": request.headers.get("user-agent"),
+        "method": request.method,
+        "path": request.url.path,
+    }
+
+
+def audit_event(
+    action: str,
+    actor_id: Optional[int] = None,
+    target_type: Optional[str] = None,
+    target_id: Any = None,
+    request: Optional[Request] = None,
+    **details: Any,
+) -> Dict[str, Any]:
+    """One audit_log row; timestamped now, not when it is written."""
+    return {
+        "created_at": datetime.utcnow(),
+        "actor_id": actor_id,
+        "action": action,
+        "target_type": target_type,
+        "target_id": None if target_id is None else str(target_id),
+        "details": details or None,
+        **request_metadata(request),
+    }
+
+
+class AuditWriter:
+    def __init__(
+        self,
+        bind: Engine,
+        queue_size: int = 10000,
+        batch_size: int = 200,
+        flush_seconds: float = 1,
+        enqueue_timeout: float = 0.05,
+    ):
+        self.bind = bind
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def record(
+        self,
+        action: str,
+        actor_id: Optional[int] = None,
+        target_type: Optional[str] = None,
+        target_id: Any = None,
+        request: Optional[Request] = None,
+        **details: Any,
+    ) -> None:
+        """Queues one event; returns without touching the database unless the queue is full."""
+        event = audit_event(action, actor_id, target_type, target_id, request, **details)
+        self._ensure_started()
+        try:
+            self._queue.put(event, timeout=self.enqueue_timeout)
+        except queue.Full:
+            metrics.inc("audit_sync_writes_total")
+            self.write([event])
+
+    def write(self, events: List[Dict[str, Any]]) -> None:
+        """Inserts events with a single multi-row INSERT."""
+        with self.bind.begin() as conn:
+            conn.execute(insert(AuditLog).values(events))
+        metrics.inc("audit_events_written_total", len(events))
+
+    # Background thread
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_seconds)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self.write(batch)
+            except Exception:
+                # Keep the trail in the application log rather than lose it
+                metrics.inc("audit_write_failures_total")
+                logger.error(
+                    "Audit batch write failed; events: %s",
+                    json.dumps(batch, default=str),
+                    exc_info=True,
+                )
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _ensure_started(self) -> None:
+        # Also restarts the thread in a worker forked after events were recorded
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def start(self) -> None:
+        self._ensure_started()
+
+    def flush(self) -> None:
+        """Blocks until every event queued so far has been written."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def stop(self) -> None:
+        """Writes what is still queued, then stops the thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+
+audit_log = AuditWriter(
+    engine,
+    queue_size=AUDIT_QUEUE_SIZE,
+    batch_size=AUDIT_BATCH_SIZE,
+    flush_seconds=AUDIT_FLUSH_SECONDS,
+    enqueue_timeout=AUDIT_ENQUEUE_TIMEOUT_SECONDS,
+)
+metrics.gauge("audit_queue_depth", audit_log.queue_depth)
@@ -0,0 +1,221 @@
+"""
+Disk storage for resumable, chunked uploads.
+
+Each upload session owns a directory under UPLOAD_DIR/sessions/<id>/:
+
+- data: the destination file, created at full size (sparse) when the
+  session opens. Chunk i is written in place at offset i * chunk_size with
+  pwrite, so chunks can arrive concurrently, out of order or repeatedly.
+- chunks/<i>: an empty marker created after chunk i's bytes are written.
+  The set of markers is the set of received chunks.
+
+Finalizing fsyncs `data` and renames it into UPLOAD_DIR, so assembly never
+copies the file. `UploadSessionCollector` removes sessions that were not
+finalized before they expired.
+
+Chunk writes hold a shared flock on `data`; assembling and discarding hold
+an exclusive one. A write that loses the race finds `data` gone or moved
+and raises StorageGone instead of writing into a finished file.
+"""
+import fcntl
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import sessionmaker
+
+from app.config import UPLOAD_DIR, UPLOAD_SESSION_TTL_HOURS, UPLOAD_GC_INTERVAL_SECONDS
+from app.core.metrics import metrics
+from app.database import SessionLocal
+from app.models.upload_session_model import UploadSession
+
+logger = logging.getLogger("app")
+
+SESSIONS_DIR = os.path.join(UPLOAD_DIR, "sessions")
+
+
+class StorageGone(Exception):
+    """The session's data file was assembled or discarded."""
+
+
+def chunk_count(total_size: int, chunk_size: int) -> int:
+    return -(-total_size // chunk_size)
+
+
+def expected_chunk_size(total_size: int, chunk_size: int, index: int) -> int:
+    """Every chunk is chunk_size bytes except a shorter last one."""
+    return min(chunk_size, total_size - index * chunk_size)
+
+
+def _session_dir(session_id: str) -> str:
+    return os.path.join(SESSIONS_DIR, session_id)
+
+
+def _data_path(session_id: str) -> str:
+    return os.path.join(_session_dir(session_id), "data")
+
+
+def _chunks_dir(session_id: str) -> str:
+    return os.path.join(_session_dir(session_id), "chunks")
+
+
+def create_storage(session_id: str, total_size: int) -> None:
+    os.makedirs(_chunks_dir(session_id))
+    with open(_data_path(session_id), "wb") as f:
+        f.truncate(total_size)
+
+
+def _is_current(fd: int, session_id: str) -> bool:
+    """True if `fd` is still the session's data file (not renamed or removed)."""
+    try:
+        return os.path.samestat(os.fstat(fd), os.stat(_data_path(session_id)))
+    except FileNotFoundError:
+        return False
+
+
+def write_chunk(
+    session_id: str, index: int, offset: int, data: bytes, still_open: Callable[[], bool] = lambda: True
+) -> None:
+    """
+    Writes chunk `index` in place, under the shared lock. `still_open` is
+    called once the lock is held and must confirm the session was not
+    claimed for completion; raises StorageGone otherwise.
+    """
+    try:
+        # No O_CREAT: never recreate a file that was assembled or discarded
+        fd = os.open(_data_path(session_id), os.O_WRONLY)
+    except FileNotFoundError:
+        raise StorageGone(session_id) from None
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        if not _is_current(fd, session_id) or not still_open():
+            raise StorageGone(session_id)
+        view = memoryview(data)
+        written = 0
+        while written < len(view):
+            written += os.pwrite(fd, view[written:], offset + written)
+        # Mark the chunk received only once its bytes are in place
+        os.close(os.open(os.path.join(_chunks_dir(session_id), str(index)), os.O_CREAT | os.O_WRONLY, 0o600))
+    finally:
+        os.close(fd)
+
+
+def received_chunks(session_id: str) -> List[int]:
+    try:
+        return sorted(int(name) for name in os.listdir(_chunks_dir(session_id)))
+    except FileNotFoundError:
+        return []
+
+
+def as_ranges(indexes: List[int]) -> List[Tuple[int, int]]:
+    """[0, 1, 2, 5, 6] -> [(0, 2), (5, 6)] (inclusive)."""
+    ranges: List[Tuple[int, int]] = []
+    for index in indexes:
+        if ranges and ranges[-1][1] == index - 1:
+            ranges[-1] = (ranges[-1][0], index)
+        else:
+            ranges.append((index, index))
+    return ranges
+
+
+def assemble(session_id: str, destination: str) -> None:
+    """Moves the completed data file to `destination` (a rename, not a copy)."""
+    data_path = _data_path(session_id)
+    fd = os.open(data_path, os.O_RDONLY)
+    try:
+        # Waits for chunk writes in progress; later ones find the file moved
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        os.fsync(fd)
+        os.replace(data_path, destination)
+    finally:
+        os.close(fd)
+    discard_storage(session_id)
+
+
+def discard_storage(session_id: str) -> None:
+    try:
+        fd = os.open(_data_path(session_id), os.O_RDONLY)
+    except FileNotFoundError:
+        shutil.rmtree(_session_dir(session_id), ignore_errors=True)
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        shutil.rmtree(_session_dir(session_id), ignore_errors=True)
+    finally:
+        os.close(fd)
+
+
+class UploadSessionCollector:
+    """Deletes expired, unfinished upload sessions and their files."""
+
+    def __init__(self, session_factory: sessionmaker, ttl_hours: float = 24, interval_seconds: float = 900):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_hours * 3600
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        """Collects expired sessions; returns how many were removed."""
+        db = self.session_factory()
+        try:
+            expired = list(db.execute(
+                select(UploadSession.id).where(UploadSession.expires_at < datetime.utcnow())
+            ).scalars())
+            if expired:
+                db.execute(delete(UploadSession).where(UploadSession.id.in_(expired)))
+                db.commit()
+            live = set(db.execute(select(UploadSession.id)).scalars())
+        finally:
+            db.close()
+
+        for session_id in expired:
+            discard_storage(session_id)
+
+        # Directories whose row is gone (e.g. cascaded with a purged user)
+        orphans = 0
+        cutoff = time.time() - self.ttl_seconds
+        try:
+            names = os.listdir(SESSIONS_DIR)
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            if name not in live and os.path.getmtime(os.path.join(SESSIONS_DIR, name)) < cutoff:
+                discard_storage(name)
+                orphans += 1
+
+        removed = len(expired) + orphans
+        if removed:
+            metrics.inc("upload_sessions_collected_total", removed)
+        return removed
+
+    # Background thread
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.error("Upload session collection failed", exc_info=True)
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="upload-gc", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+
+upload_collector = UploadSessionCollector(
+    SessionLocal,
+    ttl_hours=UPLOAD_SESSION_TTL_HOURS,
+    interval_seconds=UPLOAD_GC_INTERVAL_SECONDS,
+)
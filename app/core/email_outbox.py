@@ -0,0 +1,214 @@
+"""
+Transactional email outbox.
+
+Request handlers call `enqueue_email` inside their own transaction, so a
+message exists exactly when the change that caused it was committed and
+no request ever waits on SMTP. `OutboxSender` runs in a background thread,
+claims unsent rows in batches and delivers them over one SMTP connection
+that is kept open and reused between batches.
+
+Every worker process runs a sender. A batch is claimed with a conditional
+UPDATE (claimed_by = this batch's token, only where no live claim exists)
+and committed before any mail goes out, so two senders never deliver the
+same row. This works the same on SQLite, where SELECT ... FOR UPDATE SKIP
+LOCKED does not exist, and holds no transaction open while talking SMTP.
+"""
+import logging
+import smtplib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Callable, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import (
+    SMTP_HOST,
+    SMTP_PORT,
+    SMTP_USERNAME,
+    SMTP_PASSWORD,
+    SMTP_USE_TLS,
+    EMAIL_FROM,
+    EMAIL_OUTBOX_BATCH_SIZE,
+    EMAIL_OUTBOX_POLL_SECONDS,
+)
+from app.core.metrics import metrics
+from app.database import SessionLocal
+from app.models.email_outbox_model import EmailOutbox
+
+logger = logging.getLogger("app")
+
+MAX_ATTEMPTS = 5
+
+# Reconnect after this many idle seconds instead of trusting an old socket
+SMTP_IDLE_SECONDS = 60
+
+# Claims of a sender that died mid-batch are taken over after this long
+CLAIM_TIMEOUT_SECONDS = 300
+
+_MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+def enqueue_email(db: Session, recipient: str, subject: str, body: str) -> EmailOutbox:
+    """Adds a message to the outbox; it is sent only if the caller commits."""
+    message = EmailOutbox(recipient=recipient, subject=subject, body=body, attempts=0)
+    db.add(message)
+    return message
+
+
+def default_smtp_factory() -> smtplib.SMTP:
+    smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10)
+    if SMTP_USE_TLS:
+        smtp.starttls()
+    if SMTP_USERNAME:
+        smtp.login(SMTP_USERNAME, SMTP_PASSWORD or "")
+    return smtp
+
+
+class OutboxSender:
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        smtp_factory: Callable[[], smtplib.SMTP] = default_smtp_factory,
+        batch_size: int = 50,
+        poll_seconds: float = 2,
+    ):
+        self.session_factory = session_factory
+        self.smtp_factory = smtp_factory
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_used_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # SMTP connection reuse
+
+    def _connection(self) -> smtplib.SMTP:
+        now = time.monotonic()
+        if self._smtp is not None and now - self._smtp_used_at > SMTP_IDLE_SECONDS:
+            self._close()
+        if self._smtp is None:
+            self._smtp = self.smtp_factory()
+        self._smtp_used_at = now
+        return self._smtp
+
+    def _close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+    # Batches
+
+    def claim(self, db: Session, now: datetime) -> str:
+        """Claims up to batch_size due messages and commits; returns the claim token."""
+        token = uuid.uuid4().hex
+        claimable = or_(
+            EmailOutbox.claimed_at.is_(None),
+            EmailOutbox.claimed_at < now - timedelta(seconds=CLAIM_TIMEOUT_SECONDS),
+        )
+        due = (
+            select(EmailOutbox.id)
+            .where(
+                EmailOutbox.sent_at.is_(None),
+                EmailOutbox.attempts < MAX_ATTEMPTS,
+                or_(EmailOutbox.next_attempt_at.is_(None), EmailOutbox.next_attempt_at <= now),
+                claimable,
+            )
+            .order_by(EmailOutbox.id)
+            .limit(self.batch_size)
+        )
+        ids = db.execute(due).scalars().all()
+        if ids:
+            # Re-checked in the UPDATE: rows another sender claimed since
+            # the SELECT are left alone
+            db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(ids), EmailOutbox.sent_at.is_(None), claimable)
+                .values(claimed_by=token, claimed_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        return token
+
+    def run_once(self) -> int:
+        """Sends one batch of due messages; returns how many were delivered."""
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            token = self.claim(db, now)
+            batch = db.execute(
+                select(EmailOutbox).where(EmailOutbox.claimed_by == token).order_by(EmailOutbox.id)
+            ).scalars().all()
+            if not batch:
+                return 0
+
+            sent = 0
+            for message in batch:
+                try:
+                    self._connection().send_message(self._build(message))
+                    message.sent_at = now
+                    sent += 1
+                except OSError as exc:  # includes every SMTPException
+                    # Only per-message rejections leave the connection usable
+                    if not isinstance(exc, _MESSAGE_ERRORS):
+                        self._close()
+                    message.attempts += 1
+                    message.last_error = str(exc)[:500]
+                    message.next_attempt_at = now + timedelta(seconds=30 * 2 ** message.attempts)
+                    metrics.inc("email_outbox_failures_total")
+                message.claimed_by = None
+                message.claimed_at = None
+            db.commit()
+            metrics.inc("email_outbox_sent_total", sent)
+            return sent
+        finally:
+            db.close()
+
+    @staticmethod
+    def _build(message: EmailOutbox) -> EmailMessage:
+        email = EmailMessage()
+        email["From"] = EMAIL_FROM
+        email["To"] = message.recipient
+        email["Subject"] = message.subject
+        email.set_content(message.body)
+        return email
+
+    # Background thread
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                # Keep draining while full batches come back
+                if self.run_once() >= self.batch_size:
+                    continue
+            except Exception:
+                logger.error("Email outbox batch failed", exc_info=True)
+            self._stop.wait(self.poll_seconds)
+        self._close()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="email-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+
+def build_outbox_sender() -> Optional[OutboxSender]:
+    """The app's sender, or None when SMTP is not configured."""
+    if not SMTP_HOST:
+        return None
+    return OutboxSender(
+        SessionLocal,
+        batch_size=EMAIL_OUTBOX_BATCH_SIZE,
+        poll_seconds=EMAIL_OUTBOX_POLL_SECONDS,
+    )
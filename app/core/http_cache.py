@@ -0,0 +1,117 @@
+"""
+HTTP conditional caching for user resources.
+
+Validators are derived from (id, updated_at, role): any ORM update bumps
+User.updated_at, so the ETag changes whenever the response body could.
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response, status
+from sqlalchemy import event
+
+from app.config import PRINCIPAL_CACHE_SECONDS
+from app.models.user_model import User
+
+CACHE_CONTROL = "private, no-cache"
+
+
+class UserValidators:
+    __slots__ = ("etag", "last_modified", "updated_at")
+
+    def __init__(self, user_id: int, updated_at: Optional[datetime], role: Optional[str]):
+        stamp = updated_at.isoformat() if updated_at else "0"
+        digest = hashlib.blake2b(f"{user_id}:{stamp}:{role}".encode(), digest_size=12).hexdigest()
+        self.etag = f'W/"{digest}"'
+        self.updated_at = updated_at
+        self.last_modified = (
+            format_datetime(updated_at.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+            if updated_at else None
+        )
+
+    @classmethod
+    def for_user(cls, user) -> "UserValidators":
+        return cls(user.id, user.updated_at, user.role)
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified:
+            headers["Last-Modified"] = self.last_modified
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """True when the request's preconditions say the client copy is current."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            # Weak comparison; If-Modified-Since is ignored when present (RFC 9110)
+            if if_none_match.strip() == "*":
+                return True
+            own = self.etag[2:]
+            return any(tag.strip().removeprefix("W/") == own for tag in if_none_match.split(","))
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.updated_at:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return self.updated_at.replace(tzinfo=timezone.utc, microsecond=0) <= since
+        return False
+
+
+def not_modified(validators: UserValidators) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators.headers())
+
+
+class PrincipalCache:
+    """
+    Per-worker TTL cache of user validators, so /users/me revalidation can be
+    answered from the access token alone. Entries are dropped when this
+    worker updates or deletes the user; other workers, and other processes
+    such as create_admin, go unnoticed until the TTL runs out. That is why
+    the multi-worker launcher disables it (ttl 0) by default.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 50_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[int, Tuple[float, UserValidators]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[UserValidators]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, user) -> UserValidators:
+        """Caches validators for a User or a user_repository.get_user_row row."""
+        validators = UserValidators.for_user(user)
+        if self.ttl_seconds <= 0:
+            return validators
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {uid: e for uid, e in self._entries.items() if e[0] > now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[user.id] = (now + self.ttl_seconds, validators)
+        return validators
+
+    def evict(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_SECONDS)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_principal(mapper, connection, target):
+    principal_cache.evict(target.id)
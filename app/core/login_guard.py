@@ -0,0 +1,148 @@
+"""
+Credential-stuffing circuit breaker for /auth/login.
+
+Failed logins are counted per account and per client subnet (/24 for IPv4,
+/64 for IPv6) in count-min sketches whose counts decay exponentially, so
+memory is fixed no matter how many accounts or addresses attack. While a
+decayed count is at or above its threshold the login is rejected before
+the user lookup and before bcrypt runs. The lockout lasts until the count
+decays back under the threshold, so each further failure extends it.
+"""
+import hashlib
+import ipaddress
+import math
+import os
+import threading
+import time
+from array import array
+from typing import Optional
+
+from app.config import (
+    LOGIN_GUARD_ACCOUNT_THRESHOLD,
+    LOGIN_GUARD_SUBNET_THRESHOLD,
+    LOGIN_GUARD_HALF_LIFE_SECONDS,
+    LOGIN_GUARD_MAX_LOCKOUT_SECONDS,
+)
+
+
+class DecayingCountMinSketch:
+    """
+    Count-min sketch with exponential time decay.
+
+    Instead of decaying every counter, new increments are scaled up by
+    e^(t/tau) and reads divide by the current scale (forward decay); counters
+    are rescaled in place only when the scale grows large.
+    """
+
+    _RESCALE_AT = 1e12
+
+    def __init__(self, width: int = 8192, depth: int = 4, half_life_seconds: float = 300):
+        self.width = width
+        self.depth = depth
+        self._rate = math.log(2) / half_life_seconds
+        self._origin = time.monotonic()
+        self._rows = [array("d", bytes(8 * width)) for _ in range(depth)]
+        # Per-process hash key so attackers cannot precompute colliding keys
+        self._hash_key = os.urandom(16)
+        self._lock = threading.Lock()
+
+    def _indexes(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=4 * self.depth, key=self._hash_key).digest()
+        return [int.from_bytes(digest[4 * i:4 * i + 4], "little") % self.width for i in range(self.depth)]
+
+    def _scale(self, now: float) -> float:
+        scale = math.exp((now - self._origin) * self._rate)
+        if scale > self._RESCALE_AT:
+            for row in self._rows:
+                for i, value in enumerate(row):
+                    if value:
+                        row[i] = value / scale
+            self._origin = now
+            scale = 1.0
+        return scale
+
+    def add(self, key: str, amount: float = 1.0) -> float:
+        """Adds to the key's count and returns its new estimate."""
+        indexes = self._indexes(key)
+        with self._lock:
+            scale = self._scale(time.monotonic())
+            increment = amount * scale
+            estimate = math.inf
+            for row, index in zip(self._rows, indexes):
+                row[index] += increment
+                estimate = min(estimate, row[index])
+        return estimate / scale
+
+    def estimate(self, key: str) -> float:
+        indexes = self._indexes(key)
+        scale = math.exp((time.monotonic() - self._origin) * self._rate)
+        return min(row[index] for row, index in zip(self._rows, indexes)) / scale
+
+    def discount(self, key: str) -> None:
+        """Removes the key's estimated count (e.g. after a successful login)."""
+        indexes = self._indexes(key)
+        with self._lock:
+            current = min(row[index] for row, index in zip(self._rows, indexes))
+            for row, index in zip(self._rows, indexes):
+                row[index] = max(0.0, row[index] - current)
+
+
+def subnet_of(ip: Optional[str]) -> str:
+    try:
+        address = ipaddress.ip_address(ip)
+    except (TypeError, ValueError):
+        return f"unknown:{ip}"
+    prefix = 24 if address.version == 4 else 64
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+class LoginGuard:
+    def __init__(
+        self,
+        account_threshold: int = 5,
+        subnet_threshold: int = 50,
+        half_life_seconds: float = 300,
+        max_lockout_seconds: float = 3600,
+    ):
+        self.account_threshold = account_threshold
+        self.subnet_threshold = subnet_threshold
+        self.half_life_seconds = half_life_seconds
+        self.max_lockout_seconds = max_lockout_seconds
+        self.accounts = DecayingCountMinSketch(half_life_seconds=half_life_seconds)
+        self.subnets = DecayingCountMinSketch(half_life_seconds=half_life_seconds)
+
+    def _lockout_seconds(self, count: float, threshold: int) -> int:
+        """Time until `count` decays below `threshold` (0 if already below)."""
+        # Half a failure of slack: counts start decaying the moment they are
+        # added, so N quick failures read as slightly less than N
+        limit = threshold - 0.5
+        if count < limit:
+            return 0
+        seconds = self.half_life_seconds * math.log2(count / limit) + 1
+        return int(min(math.ceil(seconds), self.max_lockout_seconds))
+
+    def check(self, email: str, ip: Optional[str]) -> Optional[tuple[str, int]]:
+        """Returns (scope, retry_after_seconds) when the login must be rejected."""
+        retry = self._lockout_seconds(self.accounts.estimate(email.lower()), self.account_threshold)
+        if retry:
+            return "account", retry
+        retry = self._lockout_seconds(self.subnets.estimate(subnet_of(ip)), self.subnet_threshold)
+        if retry:
+            return "subnet", retry
+        return None
+
+    def record_failure(self, email: str, ip: Optional[str]) -> None:
+        self.accounts.add(email.lower())
+        self.subnets.add(subnet_of(ip))
+
+    def record_success(self, email: str) -> None:
+        # Subnet counts are kept: one valid account must not clear a botnet's record
+        self.accounts.discount(email.lower())
+
+
+login_guard = LoginGuard(
+    account_threshold=LOGIN_GUARD_ACCOUNT_THRESHOLD,
+    subnet_threshold=LOGIN_GUARD_SUBNET_THRESHOLD,
+    half_life_seconds=LOGIN_GUARD_HALF_LIFE_SECONDS,
+    max_lockout_seconds=LOGIN_GUARD_MAX_LOCKOUT_SECONDS,
+)
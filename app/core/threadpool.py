@@ -0,0 +1,126 @@
+"""
+Request thread pools with saturation metrics.
+
+Every handler and dependency in this app is a sync `def`, so FastAPI runs
+each one through `run_in_threadpool` on anyio's default limiter. `install()`
+swaps FastAPI's references to that function for `ThreadPools.run_sync`,
+which:
+
+- picks the limiter for the current request: a per-router pool when one is
+  configured in THREADPOOL_POOLS (selected by ThreadPoolMiddleware from the
+  path prefix), else the default limiter sized by THREADPOOL_SIZE;
+- records how long the call waited for a thread (histogram
+  threadpool_wait_seconds{pool=...});
+- exposes active / waiting / size gauges per pool in GET /admin/metrics.
+
+Those references are private FastAPI bindings, valid for the fastapi
+version pinned in requirements.txt. `install()` refuses to start if any of
+them is missing or no longer starlette's run_in_threadpool, and
+test_threadpool checks that sync handlers and dependencies really go
+through run_sync, so an upgrade cannot silently bypass the pools.
+"""
+import functools
+import importlib
+import math
+import time
+from contextvars import ContextVar
+from typing import Dict
+
+from anyio import CapacityLimiter, to_thread
+
+from app.core.metrics import metrics
+
+DEFAULT_POOL = "default"
+
+# Modules that import run_in_threadpool by name and call it for sync
+# endpoints and dependencies
+PATCHED_MODULES = ("fastapi.concurrency", "fastapi.dependencies.utils", "fastapi.routing")
+
+_current_pool: ContextVar[str] = ContextVar("threadpool", default=DEFAULT_POOL)
+
+
+class ThreadPools:
+    def __init__(self, pool_sizes: Dict[str, int]):
+        self.pool_sizes = dict(pool_sizes)
+        self._limiters: Dict[str, CapacityLimiter] = {}
+        # Token accounting happens in run_sync; the worker thread itself
+        # is then started without a second limit
+        self._unbounded = CapacityLimiter(math.inf)
+        for name in [DEFAULT_POOL, *self.pool_sizes]:
+            self._register_gauges(name)
+
+    def _register_gauges(self, name: str) -> None:
+        def read(attribute):
+            def value():
+                limiter = self._limiters.get(name)
+                if limiter is None:
+                    return 0
+                if attribute == "waiting":
+                    return limiter.statistics().tasks_waiting
+                return getattr(limiter, attribute)
+            return value
+
+        metrics.gauge("threadpool_active", read("borrowed_tokens"), pool=name)
+        metrics.gauge("threadpool_waiting", read("waiting"), pool=name)
+        metrics.gauge("threadpool_size", read("total_tokens"), pool=name)
+
+    def limiter(self, name: str) -> CapacityLimiter:
+        if name not in self.pool_sizes:
+            # The default limiter belongs to the running event loop; keep a
+            # reference to the latest one for the gauges
+            limiter = self._limiters[DEFAULT_POOL] = to_thread.current_default_thread_limiter()
+            return limiter
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            limiter = self._limiters[name] = CapacityLimiter(self.pool_sizes[name])
+        return limiter
+
+    def pool_for_path(self, path: str) -> str:
+        segment = path.lstrip("/").split("/", 1)[0]
+        return segment if segment in self.pool_sizes else DEFAULT_POOL
+
+    async def run_sync(self, func, *args, **kwargs):
+        name = _current_pool.get()
+        limiter = self.limiter(name)
+        start = time.perf_counter()
+        await limiter.acquire()
+        try:
+            metrics.observe("threadpool_wait_seconds", time.perf_counter() - start, pool=name)
+            return await to_thread.run_sync(
+                functools.partial(func, *args, **kwargs), limiter=self._unbounded
+            )
+        finally:
+            limiter.release()
+
+    def install(self) -> None:
+        """Routes FastAPI's sync handler/dependency calls through run_sync."""
+        from starlette.concurrency import run_in_threadpool
+
+        modules = [importlib.import_module(name) for name in PATCHED_MODULES]
+        for module in modules:
+            current = getattr(module, "run_in_threadpool", None)
+            if current is not run_in_threadpool and not isinstance(getattr(current, "__self__", None), ThreadPools):
+                raise RuntimeError(
+                    f"{module.__name__}.run_in_threadpool is not starlette's; this FastAPI "
+                    "version is not supported by app.core.threadpool"
+                )
+        for module in modules:
+            module.run_in_threadpool = self.run_sync
+
+
+class ThreadPoolMiddleware:
+    """Selects the request's thread pool from the first path segment."""
+
+    def __init__(self, app, pools: ThreadPools):
+        self.app = app
+        self.pools = pools
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.pools.pool_sizes:
+            await self.app(scope, receive, send)
+            return
+        token = _current_pool.set(self.pools.pool_for_path(scope["path"]))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_pool.reset(token)
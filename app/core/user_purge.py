@@ -0,0 +1,120 @@
+"""
+Background purge of deactivated accounts.
+
+Deactivation only sets users.deleted_at, so it is cheap and reversible.
+`UserPurger` periodically hard-deletes users deactivated more than
+USER_PURGE_AFTER_DAYS ago, in batches of USER_PURGE_BATCH_SIZE (each batch
+its own short transaction), together with their refresh tokens, file rows
+and stored files. Children are deleted explicitly because SQLite does not
+enforce the ON DELETE CASCADE of the foreign keys by default.
+"""
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import sessionmaker
+
+from app.config import USER_PURGE_AFTER_DAYS, USER_PURGE_BATCH_SIZE, USER_PURGE_INTERVAL_SECONDS, UPLOAD_DIR
+from app.core.audit import audit_log
+from app.core.metrics import metrics
+from app.database import SessionLocal
+from app.models.file_model import FileUpload
+from app.models.refresh_token_model import RefreshToken
+from app.models.upload_session_model import UploadSession
+from app.models.user_model import User
+from app.repositories import user_repository
+
+logger = logging.getLogger("app")
+
+
+class UserPurger:
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        after_days: int = 30,
+        batch_size: int = 500,
+        interval_seconds: float = 3600,
+    ):
+        self.session_factory = session_factory
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        """Purges one batch; returns how many users were deleted."""
+        cutoff = datetime.utcnow() - timedelta(days=self.after_days)
+        db = self.session_factory()
+        try:
+            candidates = user_repository.get_purgeable_user_ids(db, cutoff, self.batch_size)
+            if not candidates:
+                return 0
+            files = db.execute(
+                select(FileUpload.owner_id, FileUpload.filename).where(FileUpload.owner_id.in_(candidates))
+            ).all()
+            # deleted_at is checked again so a user reactivated since the
+            # select above survives, along with their tokens and files
+            ids = list(db.execute(
+                delete(User)
+                .where(User.id.in_(candidates), User.deleted_at < cutoff)
+                .returning(User.id)
+            ).scalars())
+            # On Postgres the foreign keys already cascaded; SQLite needs these
+            db.execute(delete(RefreshToken).where(RefreshToken.user_id.in_(ids)))
+            db.execute(delete(FileUpload).where(FileUpload.owner_id.in_(ids)))
+            # Their session directories are then collected as orphans
+            db.execute(delete(UploadSession).where(UploadSession.owner_id.in_(ids)))
+            db.commit()
+        finally:
+            db.close()
+
+        purged = set(ids)
+        for owner_id, filename in files:
+            if owner_id not in purged:
+                continue
+            try:
+                os.remove(os.path.join(UPLOAD_DIR, filename))
+            except FileNotFoundError:
+                pass
+        if not ids:
+            return 0
+        metrics.inc("users_purged_total", len(ids))
+        audit_log.record("users.purge", target_type="user", count=len(ids), user_ids=ids)
+        return len(ids)
+
+    # Background thread
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                # Keep going while full batches come back
+                if self.run_once() >= self.batch_size:
+                    continue
+            except Exception:
+                logger.error("User purge batch failed", exc_info=True)
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="user-purge", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+
+def build_user_purger() -> Optional[UserPurger]:
+    """The app's purger, or None when purging is disabled."""
+    if USER_PURGE_AFTER_DAYS <= 0:
+        return None
+    return UserPurger(
+        SessionLocal,
+        after_days=USER_PURGE_AFTER_DAYS,
+        batch_size=USER_PURGE_BATCH_SIZE,
+        interval_seconds=USER_PURGE_INTERVAL_SECONDS,
+    )
@@ -10,12 +10,14 @@ If the user already exists, the script will upgrade their role to "admin".
 import argparse
 from app.database import SessionLocal
 from app.models.user_model import User
+from app.repositories import user_repository
+from app.core.audit import audit_log, audit_event
 from app.utils.hash import hash_password
 
 def create_or_promote_admin(email: str, password: str, full_name: str | None):
     db = SessionLocal()
     try:
-        user = db.query(User).filter(User.email == email).first()
+        user = user_repository.get_user_by_email(db, email)
         if user:
             # Promote existing user to admin (update password if provided)
             print(f"[info] User exists: {email} (id={user.id}). Promoting to admin.")
@@ -25,6 +27,8 @@ def create_or_promote_admin(email: str, password: str, full_name: str | None):
             if full_name:
                 user.full_name = full_name
             db.commit()
+            # A CLI process exits right away, so write the event directly
+            audit_log.write([audit_event("admin.promote", target_type="user", target_id=user.id, source="create_admin")])
             print("[ok] Promoted existing user to admin.")
             return user
         else:
@@ -39,6 +43,7 @@ def create_or_promote_admin(email: str, password: str, full_name: str | None):
             db.add(new_user)
             db.commit()
             db.refresh(new_user)
+            audit_log.write([audit_event("admin.create", target_type="user", target_id=new_user.id, source="create_admin")])
             print(f"[ok] Created new admin user: {email} (id={new_user.id})")
             return new_user
     finally:
@@ -1,26 +1,78 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.models.user_model import User
 from app.models.refresh_token_model import RefreshToken
 from app.models.file_model import FileUpload
+from app.models.email_outbox_model import EmailOutbox
+from app.models.audit_log_model import AuditLog
+from app.models.upload_session_model import UploadSession
+from app.models.activity_rollup_model import ActivityRollup, ActiveUserMark
 
 from app.db_base import Base
 
 
-from app.config import DATABASE_URL
-
-engine = create_engine(
+from app.config import (
     DATABASE_URL,
-    pool_pre_ping=True
+    DATABASE_REPLICA_URLS,
+    REPLICA_HEALTH_CHECK_SECONDS,
+    READ_YOUR_WRITES_SECONDS,
+    SQLITE_PROFILE,
+    SQLITE_READ_POOL_SIZE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_MAINTENANCE_SECONDS,
 )
-
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False, 
-    bind=engine
+from app.db_sqlite import (
+    SQLiteMaintenance,
+    SQLiteRoutingSession,
+    create_reader_engine,
+    create_writer_engine,
+    is_file_sqlite,
 )
 
+logger = logging.getLogger("app")
+
+if SQLITE_PROFILE == "tuned" and is_file_sqlite(DATABASE_URL):
+    # Single writer connection + read pool; see app/db_sqlite.py
+    sqlite_options = dict(
+        mmap_size=SQLITE_MMAP_SIZE,
+        cache_size_kb=SQLITE_CACHE_SIZE_KB,
+        busy_timeout_ms=SQLITE_BUSY_TIMEOUT_MS,
+    )
+    engine = create_writer_engine(DATABASE_URL, **sqlite_options)
+    sqlite_reader = create_reader_engine(DATABASE_URL, pool_size=SQLITE_READ_POOL_SIZE, **sqlite_options)
+    sqlite_maintenance = SQLiteMaintenance(engine, interval_seconds=SQLITE_MAINTENANCE_SECONDS)
+
+    SessionLocal = sessionmaker(
+        class_=SQLiteRoutingSession,
+        reader=sqlite_reader,
+        autocommit=False,
+        autoflush=False,
+        bind=engine
+    )
+else:
+    engine = create_engine(
+        DATABASE_URL,
+        pool_pre_ping=True
+    )
+    sqlite_reader = None
+    sqlite_maintenance = None
+
+    SessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=engine
+    )
+
 
 def get_db():
     db = SessionLocal()
@@ -29,4 +81,115 @@ def get_db():
     finally:
         db.close()
 
+
+class ReplicaRouter:
+    """
+    Hands out read sessions from healthy replicas (round-robin), falling back
+    to the primary when no replica is usable or the user is within their
+    read-your-writes window.
+    """
+
+    def __init__(
+        self,
+        primary: sessionmaker,
+        replica_engines: List[Engine],
+        health_check_seconds: float = 10,
+        sticky_seconds: float = 5,
+    ):
+        self.primary = primary
+        self.replica_engines = replica_engines
+        self.replicas = [
+            sessionmaker(autocommit=False, autoflush=False, bind=e) for e in replica_engines
+        ]
+        self.health_check_seconds = health_check_seconds
+        self.sticky_seconds = sticky_seconds
+        self._healthy = [True] * len(replica_engines)
+        self._checked_at = [0.0] * len(replica_engines)
+        self._next = 0
+        self._sticky_until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def _is_healthy(self, index: int) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at[index] < self.health_check_seconds:
+            return self._healthy[index]
+        self._checked_at[index] = now
+        try:
+            with self.replica_engines[index].connect() as conn:
+                conn.execute(text("SELECT 1"))
+            healthy = True
+        except SQLAlchemyError:
+            healthy = False
+        if healthy != self._healthy[index]:
+            logger.warning(
+                "Read replica health changed",
+                extra={"replica": index, "healthy": healthy},
+            )
+        self._healthy[index] = healthy
+        return healthy
+
+    def mark_write(self, user_id: int) -> None:
+        """Pins this user's reads to the primary for the sticky window."""
+        if not self.replicas:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._sticky_until[user_id] = now + self.sticky_seconds
+            # Keep memory bounded by the number of recent writers
+            if len(self._sticky_until) > 10_000:
+                self._sticky_until = {
+                    uid: until for uid, until in self._sticky_until.items() if until > now
+                }
+
+    def is_sticky(self, user_id: Optional[int]) -> bool:
+        if user_id is None:
+            return False
+        until = self._sticky_until.get(user_id)
+        return until is not None and until > time.monotonic()
+
+    def session(self, user_id: Optional[int] = None) -> Session:
+        if self.replicas and not self.is_sticky(user_id):
+            for _ in range(len(self.replicas)):
+                with self._lock:
+                    index = self._next
+                    self._next = (self._next + 1) % len(self.replicas)
+                if self._is_healthy(index):
+                    return self.replicas[index]()
+        return self.primary()
+
+
+read_router = ReplicaRouter(
+    SessionLocal,
+    [create_engine(url, pool_pre_ping=True) for url in DATABASE_REPLICA_URLS],
+    health_check_seconds=REPLICA_HEALTH_CHECK_SECONDS,
+    sticky_seconds=READ_YOUR_WRITES_SECONDS,
+)
+
+
+def reset_after_fork() -> None:
+    """
+    Called in each worker forked from a preloaded parent: forgets pooled
+    connections inherited from the parent without closing its sockets.
+    """
+    engine.dispose(close=False)
+    if sqlite_reader is not None:
+        sqlite_reader.dispose(close=False)
+    for replica_engine in read_router.replica_engines:
+        replica_engine.dispose(close=False)
+
+
+# Read-your-writes: a primary session that flushed changes on behalf of a
+# known user (session.info["user_id"], set by get_current_user) pins that
+# user's reads to the primary once the transaction commits.
+@event.listens_for(SessionLocal, "after_flush")
+def _record_write(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _mark_user_write(session):
+    if session.info.pop("has_writes", False) and session.info.get("user_id") is not None:
+        read_router.mark_write(session.info["user_id"])
+
+
 Base.metadata.create_all(bind=engine)
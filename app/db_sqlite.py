@@ -0,0 +1,178 @@
+"""
+Tuned SQLite profile for single-node installs (SQLITE_PROFILE=tuned).
+
+With a file-backed DATABASE_URL, app.database builds two engines instead
+of one:
+
+- a writer engine with a single pooled connection. Its transactions start
+  with BEGIN IMMEDIATE, so a writer takes the lock up front and waits
+  busy_timeout for it. A deferred transaction that has to upgrade a read
+  lock to a write lock fails at once with "database is locked" instead;
+- a reader pool (SQLITE_READ_POOL_SIZE connections, PRAGMA query_only).
+  In WAL mode readers never block the writer and the writer never blocks
+  readers.
+
+`SQLiteRoutingSession` sends flushes and INSERT/UPDATE/DELETE statements to
+the writer and everything else to the readers. Once a transaction has
+written, its later reads also use the writer, so they see its own
+uncommitted changes. Handlers therefore hold the writer only between
+their first write and commit, not during e.g. password hashing.
+
+Every connection gets WAL, synchronous=NORMAL, memory-mapped I/O, a larger
+page cache and busy_timeout. `SQLiteMaintenance` checkpoints the WAL and
+runs PRAGMA optimize periodically and at shutdown.
+"""
+import logging
+import threading
+from contextlib import closing
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("app")
+
+
+def is_file_sqlite(url: Optional[str]) -> bool:
+    """True for sqlite URLs backed by a file (not in-memory databases)."""
+    if not url or not url.startswith("sqlite"):
+        return False
+    path = url.split("///", 1)[1] if "///" in url else ""
+    return bool(path) and not path.startswith(":memory:") and "mode=memory" not in url
+
+
+def _apply_pragmas(dbapi_connection, mmap_size: int, cache_size_kb: int, busy_timeout_ms: int) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+        cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+        # Negative values are KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size = -{int(cache_size_kb)}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+    finally:
+        cursor.close()
+
+
+def create_writer_engine(
+    url: str,
+    mmap_size: int = 256 * 1024 * 1024,
+    cache_size_kb: int = 32768,
+    busy_timeout_ms: int = 5000,
+) -> Engine:
+    engine = create_engine(
+        url,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=busy_timeout_ms / 1000 * 6,
+        pool_pre_ping=True,
+        connect_args={"check_same_thread": False},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy's "begin" event issue BEGIN instead of pysqlite
+        dbapi_connection.isolation_level = None
+        _apply_pragmas(dbapi_connection, mmap_size, cache_size_kb, busy_timeout_ms)
+        # Persistent in the database file; set by the writer only
+        dbapi_connection.execute("PRAGMA journal_mode = WAL")
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+
+def create_reader_engine(
+    url: str,
+    pool_size: int = 8,
+    mmap_size: int = 256 * 1024 * 1024,
+    cache_size_kb: int = 32768,
+    busy_timeout_ms: int = 5000,
+) -> Engine:
+    engine = create_engine(
+        url,
+        pool_size=pool_size,
+        max_overflow=pool_size,
+        pool_pre_ping=True,
+        connect_args={"check_same_thread": False},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _apply_pragmas(dbapi_connection, mmap_size, cache_size_kb, busy_timeout_ms)
+        # A write that was routed here by mistake fails loudly
+        dbapi_connection.execute("PRAGMA query_only = ON")
+
+    return engine
+
+
+class SQLiteRoutingSession(Session):
+    """Session that reads through the reader pool and writes through the writer."""
+
+    def __init__(self, *args, reader: Optional[Engine] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reader = reader
+        self._writing = False
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is not None or self.reader is None:
+            return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+        if self._writing or self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            self._writing = True
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return self.reader
+
+
+@event.listens_for(SQLiteRoutingSession, "after_transaction_end")
+def _end_write(session, transaction):
+    # Commit, rollback or close: the next transaction starts on the readers
+    if transaction.parent is None:
+        session._writing = False
+
+
+class SQLiteMaintenance:
+    """Periodic WAL checkpoint and PRAGMA optimize on the writer engine."""
+
+    def __init__(self, writer: Engine, interval_seconds: float = 300):
+        self.writer = writer
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self, mode: str = "PASSIVE") -> tuple:
+        """Checkpoints the WAL; returns SQLite's (busy, wal_pages, checkpointed_pages)."""
+        # Raw DB-API connection in autocommit mode: checkpoints cannot run
+        # inside the BEGIN IMMEDIATE transactions the engine starts
+        with closing(self.writer.raw_connection()) as raw:
+            cursor = raw.cursor()
+            try:
+                cursor.execute(f"PRAGMA wal_checkpoint({mode})")
+                result = tuple(cursor.fetchone())
+                cursor.execute("PRAGMA optimize")
+            finally:
+                cursor.close()
+        return result
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception:
+                logger.error("SQLite maintenance failed", exc_info=True)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="sqlite-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        try:
+            # Leave a small WAL behind
+            self.run_once("TRUNCATE")
+        except Exception:
+            logger.warning("Final SQLite checkpoint failed", exc_info=True)
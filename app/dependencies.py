@@ -1,43 +1,85 @@
 # External imports
-from fastapi import Depends, HTTPException, status
+import hmac
+from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy.orm import Session
 
 # Local imports
-from app.database import get_db
+from app.database import get_db, read_router
 from app.auth.oauth2_scheme import oauth2_scheme
 from app.auth.jwt_handler import verify_access_token
+from app.auth.permissions import Permission, ADMIN_PERMISSIONS, has_permissions, permissions_for_role
+from app.repositories import user_repository
+from app.core.http_cache import principal_cache
+from app.config import SERVICE_API_KEYS
 
-from typing import Dict
+from typing import Dict, Optional
+
+# Dependency to verify the access token (resolved once per request)
+def get_token_payload(token: str = Depends(oauth2_scheme)) -> Dict:
+    payload = verify_access_token(token)
+    if not payload:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"})
+    if payload.get("user_id") is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload", headers={"WWW-Authenticate": "Bearer"})
+    return payload
 
 # Dependency to get the current user based on the access token
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Dict:
+def get_current_user(payload: Dict = Depends(get_token_payload), db: Session = Depends(get_db)) -> Dict:
     """
     Verifies access token, loads user from DB and returns a dict:
     {"user": <User object>, "role": "<role>"}
     """
-    payload = verify_access_token(token)
-    if not payload:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"})
     user_id = payload.get("user_id")
     role = payload.get("role")
-    if user_id is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload", headers={"WWW-Authenticate": "Bearer"})
-    # import inside function to avoid circular imports
-    from app.models.user_model import User
-    user = db.query(User).filter(User.id == user_id).first()
+    user = user_repository.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    # Lets commits on this session pin the user's reads to the primary
+    db.info["user_id"] = user.id
+    principal_cache.put(user)
     return {"user": user, "role": role}
 
+# Dependency for read-only endpoints: a replica session when one is healthy,
+# the primary when none is or the caller wrote within READ_YOUR_WRITES_SECONDS
+def get_read_db(payload: Dict = Depends(get_token_payload)):
+    db = read_router.session(payload.get("user_id"))
+    try:
+        yield db
+    finally:
+        db.close()
+
 def get_current_active_user(data: Dict = Depends(get_current_user)):
     user = data["user"]
     if not getattr(user, "is_active", False):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
     return data
 
-def admin_only(data: Dict = Depends(get_current_user)):
-    role = data.get("role")
-    if role != "admin":
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
-    return data
+# Dependency factory for permission checks. Authorization uses only the
+# "perms" bitmask in the access token (older tokens fall back to their role),
+# so it costs no DB query; handlers that need the user row also depend on
+# get_current_user. Returns the token payload.
+def require_permissions(*required: Permission):
+    required_mask = 0
+    for permission in required:
+        required_mask |= permission
+
+    def check_permissions(payload: Dict = Depends(get_token_payload), db: Session = Depends(get_db)) -> Dict:
+        mask = payload.get("perms")
+        if mask is None:
+            mask = permissions_for_role(payload.get("role"))
+        if not has_permissions(mask, required_mask):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+        # No query is issued; this only tags the request's primary session
+        # so the caller's writes trigger read-your-writes stickiness
+        db.info["user_id"] = payload["user_id"]
+        return payload
+
+    return check_permissions
+
+admin_only = require_permissions(ADMIN_PERMISSIONS)
 
+# Dependency for service-to-service endpoints (API gateway etc.)
+def service_only(x_api_key: Optional[str] = Header(None, alias="X-API-Key")):
+    if not x_api_key or not any(hmac.compare_digest(x_api_key, key) for key in SERVICE_API_KEYS):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Service key required")
+    return x_api_key
@@ -1,3 +1,6 @@
+from contextlib import asynccontextmanager
+
+from anyio import to_thread
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
@@ -8,17 +11,68 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
 from app.core.rate_limiter import limiter
+from app.core.threadpool import ThreadPools, ThreadPoolMiddleware
+from app.core.email_outbox import build_outbox_sender
+from app.core.audit import audit_log
+from app.core.user_purge import build_user_purger
+from app.core.chunked_upload import upload_collector
+from app.core.activity import activity_collector
+from app.database import sqlite_maintenance
+from app.config import THREADPOOL_SIZE, THREADPOOL_POOLS
 from app.routers import auth_router, admin_router, user_router, file_router
 
 setup_logging()
 logger = logging.getLogger("app")
 
-app = FastAPI(title="TokenSafe - JWT + Refresh + RBAC")
+# Sync handlers/dependencies run through instrumented (optionally per-router)
+# thread pools; see app/core/threadpool.py
+thread_pools = ThreadPools(THREADPOOL_POOLS)
+thread_pools.install()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync handlers and dependencies all run on anyio's default limiter
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    logger.info(
+        "Request threadpools sized",
+        extra={"threads": THREADPOOL_SIZE, "router_pools": THREADPOOL_POOLS},
+    )
+    # Delivers queued emails (verification links, ...) when SMTP is configured
+    outbox_sender = build_outbox_sender()
+    if outbox_sender is not None:
+        outbox_sender.start()
+    # Hard-deletes long-deactivated accounts in batches
+    user_purger = build_user_purger()
+    if user_purger is not None:
+        user_purger.start()
+    # Removes abandoned resumable uploads
+    upload_collector.start()
+    # Drops closed-bucket active-user marks and old hourly rollups
+    activity_collector.start()
+    audit_log.start()
+    # Periodic WAL checkpoint / PRAGMA optimize under the tuned SQLite profile
+    if sqlite_maintenance is not None:
+        sqlite_maintenance.start()
+    yield
+    upload_collector.stop()
+    activity_collector.stop()
+    if outbox_sender is not None:
+        outbox_sender.stop()
+    if user_purger is not None:
+        user_purger.stop()
+    # Write out audit events still buffered in memory
+    audit_log.stop()
+    if sqlite_maintenance is not None:
+        sqlite_maintenance.stop()
+
+app = FastAPI(title="TokenSafe - JWT + Refresh + RBAC", lifespan=lifespan)
 
 logger.info("Starting TokenSafe application")
 
 app.state.limiter = limiter
 app.add_middleware(SlowAPIMiddleware)
+# Outermost, so the selected pool is visible inside SlowAPI's child task
+app.add_middleware(ThreadPoolMiddleware, pools=thread_pools)
 
 # Custom rate-limit error handler
 @app.exception_handler(RateLimitExceeded)
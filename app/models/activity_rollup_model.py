@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+
+from app.db_base import Base
+
+class ActivityRollup(Base):
+    """
+    One counter per (metric, bucket, bucket_start), e.g. ("logins", "hour",
+    2026-10-19 14:00). Maintained by app/core/activity.py; bucket starts are UTC.
+    """
+    __tablename__ = "activity_rollups"
+
+    # The primary key is also the index GET /admin/stats/timeseries scans
+    metric = Column(String(32), primary_key=True)
+    bucket = Column(String(8), primary_key=True)  # "hour" or "day"
+    bucket_start = Column(DateTime, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+
+class ActiveUserMark(Base):
+    """
+    A user seen in a bucket, so active_users counts each user once per
+    bucket. Only needed while the bucket is open; older marks are collected.
+    """
+    __tablename__ = "activity_active_users"
+
+    bucket = Column(String(8), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    # No foreign key: purging a user must not touch past activity
+    user_id = Column(Integer, primary_key=True)
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index, event
+
+from app.db_base import Base
+
+from datetime import datetime
+
+class AuditLog(Base):
+    __tablename__ = "audit_log"
+
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    # Who did it (None for CLI / system actions)
+    actor_id = Column(Integer, nullable=True)
+    action = Column(String, nullable=False)
+
+    # What it was done to
+    target_type = Column(String, nullable=True)
+    target_id = Column(String, nullable=True)
+
+    # Request metadata
+    ip_address = Column(String, nullable=True)
+    user_agent = Column(String, nullable=True)
+    method = Column(String, nullable=True)
+    path = Column(String, nullable=True)
+    details = Column(JSON, nullable=True)
+
+    # GET /admin/audit pages newest-first by id, optionally per actor/action/target
+    __table_args__ = (
+        Index("ix_audit_log_actor_id_id", "actor_id", "id"),
+        Index("ix_audit_log_action_id", "action", "id"),
+        Index("ix_audit_log_target_id", "target_type", "target_id", "id"),
+    )
+
+
+# Append-only: the ORM refuses to change or remove recorded events
+@event.listens_for(AuditLog, "before_update")
+@event.listens_for(AuditLog, "before_delete")
+def _reject_audit_change(mapper, connection, target):
+    raise RuntimeError("audit_log is append-only")
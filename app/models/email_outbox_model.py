@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+
+from app.db_base import Base
+
+from datetime import datetime
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+    # Retry bookkeeping for failed deliveries
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+
+    # Set by the sender that claimed the row for delivery (see OutboxSender);
+    # a claim older than CLAIM_TIMEOUT_SECONDS is considered abandoned
+    claimed_by = Column(String(32), nullable=True)
+    claimed_at = Column(DateTime, nullable=True)
+
+    # The sender polls unsent messages in id order
+    __table_args__ = (
+        Index("ix_email_outbox_pending", "sent_at", "id"),
+    )
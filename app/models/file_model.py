@@ -12,7 +12,7 @@ class FileUpload(Base):
     filename = Column(String, nullable=False)
     file_type = Column(String, nullable=False)
 
-    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
     uploaded_at = Column(DateTime, default=datetime.utcnow)
 
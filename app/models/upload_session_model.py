@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, DateTime
+
+from app.db_base import Base
+
+from datetime import datetime
+
+class UploadSession(Base):
+    """A resumable upload in progress; chunks live on disk (see app/core/chunked_upload.py)."""
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Sessions still open after this are abandoned and garbage-collected
+    expires_at = Column(DateTime, nullable=False, index=True)
+    # Set once by the request that finalizes the upload
+    completed_at = Column(DateTime, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship
 
 from app.db_base import Base
@@ -9,7 +9,8 @@ class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
+    # Unique among live accounts only; see ix_users_email_live below
+    email = Column(String, nullable=False)
     full_name = Column(String, nullable=True)
     hashed_password = Column(String, nullable=False)
     role = Column(String, default="user")
@@ -22,12 +23,29 @@ class User(Base):
 
     last_login_ip = Column(String, nullable=True)
 
-    
+    # Soft delete: set (with is_active=False) on deactivation, cleared on
+    # reactivation; rows deactivated long enough are purged by UserPurger
+    deleted_at = Column(DateTime, nullable=True)
+
+    # Partial indexes: hot lookups only ever see live accounts, so their
+    # indexes leave deactivated rows out
+    __table_args__ = (
+        Index(
+            "ix_users_email_live", email, unique=True,
+            postgresql_where=deleted_at.is_(None), sqlite_where=deleted_at.is_(None),
+        ),
+        Index(
+            "ix_users_live_role_id", role, id,
+            postgresql_where=deleted_at.is_(None), sqlite_where=deleted_at.is_(None),
+        ),
+        Index(
+            "ix_users_deleted_at", deleted_at,
+            postgresql_where=deleted_at.is_not(None), sqlite_where=deleted_at.is_not(None),
+        ),
+    )
 
     # Relationships
 
     files = relationship("FileUpload", back_populates="owner", cascade="all, delete-orphan")
     refresh_tokens = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan")
 
-
-    # TEMP: email verification logic coming soon
@@ -0,0 +1,25 @@
+"""
+Activity rollup queries. A series is one primary-key range scan on
+activity_rollups (metric, bucket, bucket_start), whatever the range.
+"""
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import Session
+
+from app.models.activity_rollup_model import ActivityRollup
+
+
+def get_series(db: Session, metric: str, bucket: str, start: datetime, end: datetime) -> Dict[datetime, int]:
+    """{bucket_start: value} for start <= bucket_start < end; empty buckets are absent."""
+    stmt = lambda_stmt(
+        lambda: select(ActivityRollup.bucket_start, ActivityRollup.value)
+        .where(
+            ActivityRollup.metric == metric,
+            ActivityRollup.bucket == bucket,
+            ActivityRollup.bucket_start >= start,
+            ActivityRollup.bucket_start < end,
+        )
+    )
+    return dict(db.execute(stmt).all())
@@ -0,0 +1,40 @@
+"""
+Admin audit log queries.
+
+Pages are keyset-paginated newest-first on id ("before_id" cursor), so
+every page is an index range scan on one of the (filter column, id)
+indexes of audit_log, however deep the caller pages.
+"""
+from typing import Optional
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import Session
+
+from app.models.audit_log_model import AuditLog
+
+
+def list_events(
+    db: Session,
+    actor_id: Optional[int] = None,
+    action: Optional[str] = None,
+    target_type: Optional[str] = None,
+    target_id: Optional[str] = None,
+    before_id: Optional[int] = None,
+    limit: int = 50,
+):
+    stmt = lambda_stmt(lambda: select(AuditLog))
+
+    if actor_id is not None:
+        stmt += lambda s: s.where(AuditLog.actor_id == actor_id)
+    if action:
+        stmt += lambda s: s.where(AuditLog.action == action)
+    if target_type:
+        stmt += lambda s: s.where(AuditLog.target_type == target_type)
+    if target_id is not None:
+        stmt += lambda s: s.where(AuditLog.target_id == target_id)
+    if before_id is not None:
+        stmt += lambda s: s.where(AuditLog.id < before_id)
+
+    stmt += lambda s: s.order_by(AuditLog.id.desc()).limit(limit)
+
+    return db.execute(stmt).scalars().all()
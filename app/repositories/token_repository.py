@@ -0,0 +1,35 @@
+"""
+Refresh-token queries, built like user_repository with cached lambda_stmt.
+"""
+from datetime import datetime
+from typing import Iterable, Set
+
+from sqlalchemy import lambda_stmt, select, update
+from sqlalchemy.orm import Session
+
+from app.models.refresh_token_model import RefreshToken
+
+
+def get_usable_refresh_tokens(db: Session, tokens: Iterable[str]) -> Set[str]:
+    """Returns the subset of tokens that are stored, not revoked and not expired."""
+    values = list(set(tokens))
+    if not values:
+        return set()
+    now = datetime.utcnow()
+    stmt = lambda_stmt(
+        lambda: select(RefreshToken.token).where(
+            RefreshToken.token.in_(values),
+            RefreshToken.revoked.is_not(True),
+            RefreshToken.expires_at >= now,
+        )
+    )
+    return set(db.execute(stmt).scalars())
+
+
+def revoke_user_tokens(db: Session, user_id: int) -> None:
+    """Revokes every refresh token of a user; the caller commits."""
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked.is_not(True))
+        .values(revoked=True)
+    )
@@ -0,0 +1,116 @@
+"""
+Shared user queries.
+
+Statements are built with `lambda_stmt`, so SQLAlchemy caches the
+constructed statement and its compiled SQL per call site and only binds
+new parameter values on each call. Optional filters are appended as extra
+lambdas, which gives one cache entry per filter combination ("shape").
+
+Soft-deleted users (deleted_at set) are invisible to every query here
+unless a function says otherwise; the `deleted_at IS NULL` condition
+matches the partial indexes on users.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, lambda_stmt, select
+from sqlalchemy.orm import Session
+
+from app.models.user_model import User
+from app.utils.serialization import USER_RESPONSE_COLUMNS
+
+
+def get_user_by_id(db: Session, user_id: int, include_deleted: bool = False) -> Optional[User]:
+    stmt = lambda_stmt(lambda: select(User).where(User.id == user_id))
+    if not include_deleted:
+        stmt += lambda s: s.where(User.deleted_at.is_(None))
+    return db.execute(stmt).scalars().first()
+
+
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    stmt = lambda_stmt(lambda: select(User).where(User.email == email, User.deleted_at.is_(None)))
+    return db.execute(stmt).scalars().first()
+
+
+def get_user_row(db: Session, user_id: int):
+    """
+    Returns only the UserResponse columns (plus updated_at, for HTTP cache
+    validators) for one user, or None.
+    """
+    stmt = lambda_stmt(
+        lambda: select(*USER_RESPONSE_COLUMNS, User.updated_at).where(
+            User.id == user_id, User.deleted_at.is_(None)
+        )
+    )
+    return db.execute(stmt).first()
+
+
+def get_active_flags(db: Session, user_ids: Iterable[int]) -> Dict[int, bool]:
+    """Maps each existing user id to its is_active flag, in one query."""
+    ids = list(set(user_ids))
+    if not ids:
+        return {}
+    stmt = lambda_stmt(lambda: select(User.id, User.is_active).where(User.id.in_(ids)))
+    return {row.id: bool(row.is_active) for row in db.execute(stmt)}
+
+
+def count_users(db: Session) -> int:
+    stmt = lambda_stmt(lambda: select(func.count()).select_from(User).where(User.deleted_at.is_(None)))
+    return db.execute(stmt).scalar_one()
+
+
+def list_user_rows(
+    db: Session,
+    keyword: Optional[str] = None,
+    role: Optional[str] = None,
+    sort: str = "desc",
+    skip: int = 0,
+    limit: int = 10,
+):
+    """
+    Search (email substring), filter (role), sort (by id) and paginate users.
+    Returns rows holding only the UserResponse columns.
+    """
+    stmt = lambda_stmt(lambda: select(*USER_RESPONSE_COLUMNS).where(User.deleted_at.is_(None)))
+
+    # SEARCH
+    if keyword:
+        pattern = f"%{keyword}%"
+        stmt += lambda s: s.where(User.email.ilike(pattern))
+
+    # FILTER
+    if role:
+        stmt += lambda s: s.where(User.role == role)
+
+    # SORT
+    if sort == "asc":
+        stmt += lambda s: s.order_by(User.id.asc())
+    else:
+        stmt += lambda s: s.order_by(User.id.desc())
+
+    # PAGINATION
+    stmt += lambda s: s.offset(skip).limit(limit)
+
+    return db.execute(stmt).all()
+
+
+def get_purgeable_user_ids(db: Session, deleted_before: datetime, limit: int) -> List[int]:
+    """Ids of users soft-deleted before `deleted_before`, oldest first."""
+    stmt = lambda_stmt(
+        lambda: select(User.id)
+        .where(User.deleted_at.is_not(None), User.deleted_at < deleted_before)
+        .order_by(User.deleted_at)
+        .limit(limit)
+    )
+    return list(db.execute(stmt).scalars())
+
+
+def soft_delete_user(user: User) -> None:
+    """Deactivates the account and hides it from lookups; the caller commits."""
+    user.is_active = False
+    user.deleted_at = datetime.utcnow()
+
+
+def restore_user(user: User) -> None:
+    user.is_active = True
+    user.deleted_at = None
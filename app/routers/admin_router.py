@@ -1,28 +1,90 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from typing import List, Optional
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.dependencies import admin_only  # admin_only should raise 403 if not admin
+from app.dependencies import require_permissions, get_read_db  # raises 403 without the permission bits
+from app.auth.permissions import Permission
+from app.repositories import user_repository, audit_repository, activity_repository
 from app.models.user_model import User
 from app.schemas.user_schema import UserResponse
+from app.schemas.audit_schema import AuditPage
+from app.schemas.stats_schema import Timeseries
+from app.utils.serialization import users_json
+from app.core.metrics import metrics
+from app.core.audit import audit_log
+from app.core import accounts, activity
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
 @router.get("/stats", summary="Admin: site statistics")
-def get_stats(_admin: dict = Depends(admin_only), db: Session = Depends(get_db)):
+def get_stats(_admin: dict = Depends(require_permissions(Permission.VIEW_STATS)), db: Session = Depends(get_read_db)):
     """
     Return basic admin statistics. _admin dependency enforces that the caller is an admin.
     """
-    total = db.query(User).count()
+    total = user_repository.count_users(db)
     return {"total_users": total}
 
 
+# Longest series one request may ask for (about 83 days hourly, 5 years daily)
+MAX_TIMESERIES_POINTS = 2000
+
+
+@router.get("/stats/timeseries", response_model=Timeseries, summary="Admin: activity over time")
+def get_timeseries(
+    _admin: dict = Depends(require_permissions(Permission.VIEW_STATS)),
+    db: Session = Depends(get_read_db),
+    metric: activity.Metric = Query(...),
+    bucket: activity.Bucket = Query("day"),
+    start: Optional[datetime] = Query(None, alias="from", description="UTC; default 30 days (day) or 48 hours (hour) before to"),
+    end: Optional[datetime] = Query(None, alias="to", description="UTC, exclusive; default now"),
+):
+    """
+    Registrations, logins, active users, uploads or upload bytes per hour
+    or day, read from the activity rollups (see app/core/activity.py).
+    Counting started when the rollups were deployed.
+    """
+    end = end or datetime.utcnow()
+    start = start or end - (timedelta(days=30) if bucket == "day" else timedelta(hours=48))
+    # Compare naive UTC with the stored bucket starts
+    if end.tzinfo is not None:
+        end = end.astimezone(timezone.utc).replace(tzinfo=None)
+    if start.tzinfo is not None:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'from' must be before 'to'")
+
+    if (end - activity.bucket_start(start, bucket)) / activity.BUCKETS[bucket] > MAX_TIMESERIES_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range too long: at most {MAX_TIMESERIES_POINTS} {bucket} buckets",
+        )
+    starts = list(activity.bucket_starts(start, end, bucket))
+
+    values = activity_repository.get_series(db, metric, bucket, starts[0], end)
+    return {
+        "metric": metric,
+        "bucket": bucket,
+        "points": [{"start": s, "value": values.get(s, 0)} for s in starts],
+    }
+
+
+@router.get("/metrics", summary="Admin: process metrics")
+def get_metrics(_admin: dict = Depends(require_permissions(Permission.VIEW_STATS))):
+    """
+    Return this worker's in-process metrics (counters such as login circuit
+    breaker rejections).
+    """
+    return metrics.snapshot()
+
+
 @router.get("/users", response_model=List[UserResponse], summary="Admin: list users")
 def list_users(
-    _admin: dict = Depends(admin_only),
-    db: Session = Depends(get_db),
+    request: Request,
+    _admin: dict = Depends(require_permissions(Permission.READ_USERS)),
+    db: Session = Depends(get_read_db),
     # 🔍 SEARCH
     keyword: Optional[str] = Query(
         None, description="Search users by email"
@@ -39,37 +101,91 @@ def list_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100)
 ):
-    query = db.query(User)
+    users = user_repository.list_user_rows(db, keyword, role, sort, skip, limit)
+    audit_log.record(
+        "users.list", actor_id=_admin["user_id"], request=request,
+        keyword=keyword, role=role, sort=sort, skip=skip, limit=limit, returned=len(users),
+    )
+    return users_json(users)
 
-    # SEARCH
-    if keyword:
-        query = query.filter(User.email.ilike(f"%{keyword}%"))
 
-    # FILTER
-    if role:
-        query = query.filter(User.role == role)
+@router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Admin: delete user")
+def delete_user(user_id: int, request: Request, _admin: dict = Depends(require_permissions(Permission.DELETE_USERS)), db: Session = Depends(get_db)):
+    """
+    Delete a user by id. Admin only.
+    This is a soft delete (same as /deactivate): the account can be
+    reactivated until the background purge removes it.
+    """
+    user = _deactivate(db, user_id)
+    audit_log.record(
+        "user.delete", actor_id=_admin["user_id"], target_type="user", target_id=user_id,
+        request=request, email=user.email,
+    )
+    return
 
-    # SORT
-    if sort == "asc":
-        query = query.order_by(User.id.asc())
-    else:
-        query = query.order_by(User.id.desc())
 
-    users = query.offset(skip).limit(limit).all()
+def _deactivate(db: Session, user_id: int) -> User:
+    user = user_repository.get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    return users
+    accounts.deactivate_user(db, user)
+    return user
 
 
-@router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Admin: delete user")
-def delete_user(user_id: int, _admin: dict = Depends(admin_only), db: Session = Depends(get_db)):
+@router.post("/users/{user_id}/deactivate", status_code=status.HTTP_204_NO_CONTENT, summary="Admin: deactivate user")
+def deactivate_user(user_id: int, request: Request, _admin: dict = Depends(require_permissions(Permission.DELETE_USERS)), db: Session = Depends(get_db)):
     """
-    Delete a user by id. Admin only.
-    Consider soft-delete / audit log in production.
+    Deactivate (soft-delete) a user: they can no longer log in or refresh,
+    and drop out of user lookups and lists. Reversible with /reactivate
+    until the account is purged (USER_PURGE_AFTER_DAYS).
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = _deactivate(db, user_id)
+    audit_log.record(
+        "user.deactivate", actor_id=_admin["user_id"], target_type="user", target_id=user_id,
+        request=request, email=user.email,
+    )
+    return
+
+
+@router.post("/users/{user_id}/reactivate", response_model=UserResponse, summary="Admin: reactivate user")
+def reactivate_user(user_id: int, request: Request, _admin: dict = Depends(require_permissions(Permission.DELETE_USERS)), db: Session = Depends(get_db)):
+    user = user_repository.get_user_by_id(db, user_id, include_deleted=True)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    if user.deleted_at is None:
+        return user
 
-    db.delete(user)
-    db.commit()
-    return
+    # Emails are unique among live accounts only; someone may have
+    # registered this one since
+    if user_repository.get_user_by_email(db, user.email):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email is now used by another account")
+
+    accounts.reactivate_user(db, user)
+    db.refresh(user)
+    audit_log.record(
+        "user.reactivate", actor_id=_admin["user_id"], target_type="user", target_id=user_id, request=request,
+    )
+    return user
+
+
+@router.get("/audit", response_model=AuditPage, summary="Admin: audit log")
+def list_audit_events(
+    _admin: dict = Depends(require_permissions(Permission.VIEW_AUDIT)),
+    db: Session = Depends(get_read_db),
+    actor_id: Optional[int] = Query(None, description="Only events by this user"),
+    action: Optional[str] = Query(None, description="e.g. user.delete"),
+    target_type: Optional[str] = Query(None, description="e.g. user"),
+    target_id: Optional[str] = Query(None),
+    # 📄 PAGINATION (newest first)
+    before_id: Optional[int] = Query(None, ge=1, description="Return events older than this id"),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """
+    Page through the audit log, newest first. Pass the returned
+    next_before_id as before_id to get the next page. Events reach the log
+    asynchronously, usually within AUDIT_FLUSH_SECONDS.
+    """
+    events = audit_repository.list_events(db, actor_id, action, target_type, target_id, before_id, limit)
+    next_before_id = events[-1].id if len(events) == limit else None
+    return {"items": events, "next_before_id": next_before_id}
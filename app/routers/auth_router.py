@@ -1,5 +1,11 @@
 import logging
 from app.core.rate_limiter import limiter
+from app.core.login_guard import login_guard
+from app.core.metrics import metrics
+from app.core.email_outbox import enqueue_email
+from app.core.activity import record_activity
+from app.config import APP_BASE_URL, EMAIL_VERIFICATION_EXPIRE_HOURS
+from slowapi.util import get_remote_address
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from fastapi.security import OAuth2PasswordRequestForm
@@ -10,20 +16,37 @@ from datetime import datetime, timedelta
 from app.database import get_db
 from app.models.user_model import User
 from app.models.refresh_token_model import RefreshToken
+from app.repositories import user_repository, token_repository
 from app.schemas.user_schema import UserCreate, UserResponse
-from app.schemas.token_schema import TokenPair, TokenOut
-from app.utils.hash import hash_password, verify_password
+from app.schemas.token_schema import TokenPair, TokenOut, IntrospectRequest, IntrospectResponse
+from app.utils.hash import hash_password, verify_and_rehash
 from app.auth.jwt_handler import (
     create_access_token,
     create_refresh_token,
-    verify_refresh_token
+    verify_access_tokens,
+    verify_refresh_token,
+    revoke_access_token,
+    create_email_verification_token,
+    verify_email_verification_token,
 )
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_token_payload, service_only
 
 logger = logging.getLogger("app")
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+def _enqueue_verification_email(db: Session, user: User) -> None:
+    token = create_email_verification_token(user.id, user.email)
+    link = f"{APP_BASE_URL}/auth/verify-email?token={token}"
+    enqueue_email(
+        db,
+        user.email,
+        "Verify your email",
+        f"Hi {user.full_name or user.email},\n\n"
+        f"Confirm your email address by opening this link:\n\n{link}\n\n"
+        f"The link expires in {EMAIL_VERIFICATION_EXPIRE_HOURS} hours.\n",
+    )
+
 # REGISTER
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def register(user_in: UserCreate, db: Session = Depends(get_db)):
@@ -33,7 +56,7 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)):
         extra={"email": user_in.email},
     )
 
-    existing = db.query(User).filter(User.email == user_in.email).first()
+    existing = user_repository.get_user_by_email(db, user_in.email)
     if existing:
         logger.warning(
             "Registration failed - email already exists",
@@ -53,6 +76,10 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(user)
+    db.flush()  # assigns user.id for the verification token
+    _enqueue_verification_email(db, user)
+    record_activity(db, registrations=1)
+    # The user, their verification email and the counter commit (or roll back) together
     db.commit()
     db.refresh(user)
 
@@ -80,8 +107,30 @@ def login(
     )
 
     try:
-        user = db.query(User).filter(User.email == form_data.username).first()
-        if not user or not verify_password(form_data.password, user.hashed_password):
+        # Circuit breaker: reject attacked accounts/subnets before any hashing
+        client_ip = get_remote_address(request)
+        blocked = login_guard.check(form_data.username, client_ip)
+        if blocked:
+            scope, retry_after = blocked
+            metrics.inc("login_guard_rejections_total", scope=scope)
+            logger.warning(
+                "Login rejected by circuit breaker",
+                extra={"email": form_data.username, "scope": scope},
+            )
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many failed login attempts. Try again later.",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+        user = user_repository.get_user_by_email(db, form_data.username)
+        valid, new_hash = (
+            verify_and_rehash(form_data.password, user.hashed_password)
+            if user else (False, None)
+        )
+        if not valid:
+            login_guard.record_failure(form_data.username, client_ip)
+            metrics.inc("login_failures_total")
             logger.warning(
                 "Failed login attempt",
                 extra={"email": form_data.username},
@@ -91,6 +140,8 @@ def login(
                 detail="Invalid credentials",
             )
 
+        login_guard.record_success(form_data.username)
+
         access_token = create_access_token(
             {"user_id": user.id, "role": user.role}
         )
@@ -98,6 +149,14 @@ def login(
             {"user_id": user.id}
         )
 
+        # Upgrade the stored hash if the scheme or cost setting changed
+        if new_hash:
+            user.hashed_password = new_hash
+            logger.info(
+                "Password hash upgraded on login",
+                extra={"user_id": user.id},
+            )
+
         # Store refresh token in DB
         now = datetime.utcnow()
         expires_at = now + timedelta(days=7)
@@ -109,6 +168,7 @@ def login(
             revoked=False,
         )
         db.add(db_rt)
+        record_activity(db, user_id=user.id, logins=1)
         db.commit()
 
         # Set secure cookies
@@ -193,9 +253,7 @@ def refresh(
             detail="Refresh token revoked or expired",
         )
 
-    user = db.query(User).filter(
-        User.id == token_payload.get("user_id")
-    ).first()
+    user = user_repository.get_user_by_id(db, token_payload.get("user_id"))
 
     if not user:
         logger.error("Refresh token valid but user not found")
@@ -208,6 +266,10 @@ def refresh(
         {"user_id": user.id, "role": user.role}
     )
 
+    # Writes at most once per user per hour (per worker)
+    if record_activity(db, user_id=user.id):
+        db.commit()
+
     response.set_cookie(
         key="access_token",
         value=new_access,
@@ -229,6 +291,51 @@ def refresh(
 
 
 
+# EMAIL VERIFICATION
+@router.get("/verify-email", status_code=status.HTTP_200_OK)
+@limiter.limit("20/minute")
+def verify_email(request: Request, token: str, db: Session = Depends(get_db)):
+    payload = verify_email_verification_token(token)
+    if payload is None or "error" in payload:
+        logger.warning("Email verification failed - invalid or expired token")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid or expired verification link",
+        )
+
+    user = user_repository.get_user_by_id(db, payload["user_id"])
+    # A link issued for an address the account no longer has is void
+    if not user or user.email != payload.get("email"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid or expired verification link",
+        )
+
+    if not user.is_verified:
+        user.is_verified = True
+        user.email_verified_at = datetime.utcnow()
+        db.commit()
+        logger.info("Email verified", extra={"user_id": user.id})
+
+    return {"detail": "Email verified"}
+
+
+@router.post("/resend-verification", status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("3/hour")
+def resend_verification(
+    request: Request,
+    db: Session = Depends(get_db),
+    current=Depends(get_current_user),
+):
+    user = current["user"]
+    if user.is_verified:
+        return {"detail": "Email already verified"}
+
+    _enqueue_verification_email(db, user)
+    db.commit()
+    return {"detail": "Verification email queued"}
+
+
 # LOGOUT (CLEAR COOKIES)
 @router.post("/logout", status_code=status.HTTP_200_OK)
 @limiter.limit("20/minute")
@@ -238,6 +345,7 @@ def logout(
     payload: dict | None = None,
     db: Session = Depends(get_db),
     current=Depends(get_current_user),
+    token_claims: dict = Depends(get_token_payload),
 ):
     logger.info(
         "Logout request received",
@@ -260,6 +368,9 @@ def logout(
                 extra={"user_id": db_token.user_id},
             )
 
+    # Deny the access token for the rest of its lifetime
+    revoke_access_token(token_claims)
+
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
 
@@ -268,4 +379,61 @@ def logout(
         extra={"user_id": current.get("user_id")},
     )
 
-    return {"detail": "Logged out"}
\ No newline at end of file
+    return {"detail": "Logged out"}
+
+
+# BATCH TOKEN INTROSPECTION (SERVICE-TO-SERVICE)
+@router.post("/introspect", response_model=IntrospectResponse, status_code=status.HTTP_200_OK)
+def introspect(
+    body: IntrospectRequest,
+    db: Session = Depends(get_db),
+    _service: str = Depends(service_only),
+):
+    """
+    Validates a batch of tokens for gateways. Signatures are checked in
+    memory; access-token denylist entries (by jti and by user), refresh-token
+    revocation and user status are then resolved with one set-based lookup
+    each, however many tokens are in the batch.
+    """
+    if body.token_type == "access":
+        payloads = verify_access_tokens(body.tokens)
+    else:
+        payloads = [verify_refresh_token(token) for token in body.tokens]
+
+    user_ids = [
+        p["user_id"] for p in payloads
+        if p and "error" not in p and p.get("user_id") is not None
+    ]
+    active_flags = user_repository.get_active_flags(db, user_ids)
+
+    usable_refresh = set()
+    if body.token_type == "refresh":
+        usable_refresh = token_repository.get_usable_refresh_tokens(
+            db, [t for t, p in zip(body.tokens, payloads) if p and "error" not in p]
+        )
+
+    results = []
+    for token, payload in zip(body.tokens, payloads):
+        if not payload:
+            error = "invalid"
+        elif "error" in payload:
+            error = payload["error"]
+        elif payload.get("user_id") not in active_flags:
+            error = "user_not_found"
+        elif not active_flags[payload["user_id"]]:
+            error = "user_inactive"
+        elif body.token_type == "refresh" and token not in usable_refresh:
+            error = "revoked"
+        else:
+            error = None
+        if error:
+            results.append({"active": False, "error": error})
+        else:
+            results.append({"active": True, "claims": payload})
+
+    logger.info(
+        "Token introspection batch processed",
+        extra={"count": len(results), "token_type": body.token_type},
+    )
+
+    return {"results": results}
@@ -1,24 +1,43 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Request, status, concurrency
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 import os
+import re
 import shutil
+from datetime import datetime, timedelta
 from uuid import uuid4
 
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_token_payload
 from app.models.file_model import FileUpload
-from app.schemas.file_schema import FileResponse
+from app.models.upload_session_model import UploadSession
+from app.schemas.file_schema import FileResponse, UploadSessionCreate, UploadSessionOut, UploadStatus
+from app.core import chunked_upload
+from app.core.activity import record_activity
+from app.config import UPLOAD_DIR, UPLOAD_CHUNK_SIZE, UPLOAD_SESSION_TTL_HOURS
 
 router = APIRouter(prefix="/files", tags=["Files"])
 
-UPLOAD_DIR = "uploads"
-
 # Create uploads folder if not exists
 if not os.path.exists(UPLOAD_DIR):
     os.makedirs(UPLOAD_DIR)
 
 
+_EXTENSION = re.compile(r"\.[A-Za-z0-9]{1,16}")
+
+
+def _base_name(filename: str) -> str:
+    """The client's file name without any directory part (either separator)."""
+    return os.path.basename(filename.replace("\\", "/"))
+
+
+def _stored_name(filename: str) -> str:
+    """Unique name under UPLOAD_DIR, keeping the client's extension only if it is plain."""
+    ext = os.path.splitext(_base_name(filename))[1]
+    return f"{uuid4()}{ext if _EXTENSION.fullmatch(ext) else ''}"
+
+
 @router.post("/upload", response_model=FileResponse, status_code=status.HTTP_201_CREATED)
 def upload_file(
     file: UploadFile = File(...),
@@ -28,13 +47,13 @@ def upload_file(
     user = data["user"]
 
     # Generate safe unique filename
-    file_ext = file.filename.split(".")[-1]
-    safe_filename = f"{uuid4()}.{file_ext}"
+    safe_filename = _stored_name(file.filename or "")
     file_path = os.path.join(UPLOAD_DIR, safe_filename)
 
     # Save file to disk
     with open(file_path, "wb") as buffer:
         shutil.copyfileobj(file.file, buffer)
+        size = buffer.tell()
 
     # Save file info to DB
     db_file = FileUpload(
@@ -43,6 +62,7 @@ def upload_file(
         owner_id=user.id
     )
     db.add(db_file)
+    record_activity(db, user_id=user.id, uploads=1, upload_bytes=size)
     db.commit()
     db.refresh(db_file)
 
@@ -51,3 +71,172 @@ def upload_file(
 
 
 
+
+
+# RESUMABLE CHUNKED UPLOADS
+#
+# 1. POST /files/uploads                       -> session id and chunk size
+# 2. PUT  /files/uploads/{id}/chunks/{index}   -> raw chunk bytes; any order,
+#                                                 concurrently, retry freely
+# 3. GET  /files/uploads/{id}                  -> received chunk ranges (resume)
+# 4. POST /files/uploads/{id}/complete         -> FileUpload row
+
+def _get_session(db: Session, session_id: str, owner_id: int) -> UploadSession:
+    upload = db.get(UploadSession, session_id)
+    if not upload or upload.owner_id != owner_id or upload.completed_at is not None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    return upload
+
+
+@router.post("/uploads", response_model=UploadSessionOut, status_code=status.HTTP_201_CREATED)
+def create_upload_session(
+    upload_in: UploadSessionCreate,
+    db: Session = Depends(get_db),
+    data: dict = Depends(get_current_user)
+):
+    upload = UploadSession(
+        id=uuid4().hex,
+        owner_id=data["user"].id,
+        filename=_base_name(upload_in.filename),
+        content_type=upload_in.content_type,
+        total_size=upload_in.total_size,
+        chunk_size=UPLOAD_CHUNK_SIZE,
+        expires_at=datetime.utcnow() + timedelta(hours=UPLOAD_SESSION_TTL_HOURS),
+    )
+    chunked_upload.create_storage(upload.id, upload.total_size)
+    db.add(upload)
+    db.commit()
+
+    return {
+        "id": upload.id,
+        "chunk_size": upload.chunk_size,
+        "total_chunks": chunked_upload.chunk_count(upload.total_size, upload.chunk_size),
+        "expires_at": upload.expires_at,
+    }
+
+
+def _write_chunk(db: Session, session_id: str, index: int, offset: int, body: bytes) -> None:
+    def still_open() -> bool:
+        # Fresh read: /complete may have claimed the session meanwhile
+        return db.scalar(
+            select(UploadSession.id).where(UploadSession.id == session_id, UploadSession.completed_at.is_(None))
+        ) is not None
+
+    try:
+        chunked_upload.write_chunk(session_id, index, offset, body, still_open)
+    except chunked_upload.StorageGone:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+
+
+# Async so a slow client costs no thread while its chunk streams in; only
+# the session lookups and the disk write run on the thread pool
+@router.put("/uploads/{session_id}/chunks/{index}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_chunk(
+    session_id: str,
+    index: int,
+    request: Request,
+    payload: dict = Depends(get_token_payload),
+    db: Session = Depends(get_db),
+):
+    upload = await concurrency.run_in_threadpool(_get_session, db, session_id, payload["user_id"])
+    if not 0 <= index < chunked_upload.chunk_count(upload.total_size, upload.chunk_size):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Chunk index out of range")
+    # Hold no connection or read snapshot while the body streams in
+    await concurrency.run_in_threadpool(db.close)
+
+    expected = chunked_upload.expected_chunk_size(upload.total_size, upload.chunk_size, index)
+    body = bytearray()
+    async for part in request.stream():
+        body += part
+        if len(body) > expected:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Chunk too large")
+    if len(body) != expected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Chunk {index} must be {expected} bytes",
+        )
+
+    await concurrency.run_in_threadpool(_write_chunk, db, session_id, index, index * upload.chunk_size, body)
+
+
+@router.get("/uploads/{session_id}", response_model=UploadStatus)
+def get_upload_status(
+    session_id: str,
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload)
+):
+    upload = _get_session(db, session_id, payload["user_id"])
+    total_chunks = chunked_upload.chunk_count(upload.total_size, upload.chunk_size)
+    received = chunked_upload.received_chunks(session_id)
+    return {
+        "id": upload.id,
+        "total_size": upload.total_size,
+        "chunk_size": upload.chunk_size,
+        "total_chunks": total_chunks,
+        "received_chunks": chunked_upload.as_ranges(received),
+        "missing_chunks": total_chunks - len(received),
+        "expires_at": upload.expires_at,
+    }
+
+
+@router.post("/uploads/{session_id}/complete", response_model=FileResponse, status_code=status.HTTP_201_CREATED)
+def complete_upload(
+    session_id: str,
+    db: Session = Depends(get_db),
+    data: dict = Depends(get_current_user)
+):
+    user = data["user"]
+    upload = _get_session(db, session_id, user.id)
+    missing = chunked_upload.chunk_count(upload.total_size, upload.chunk_size) - len(
+        chunked_upload.received_chunks(session_id)
+    )
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload incomplete: {missing} chunks missing",
+        )
+
+    safe_filename = _stored_name(upload.filename)
+
+    # Claim the session so a concurrent /complete cannot assemble it twice
+    claimed = db.execute(
+        update(UploadSession)
+        .where(UploadSession.id == session_id, UploadSession.completed_at.is_(None))
+        .values(completed_at=datetime.utcnow())
+    ).rowcount
+    db.commit()
+    if not claimed:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+
+    try:
+        chunked_upload.assemble(session_id, os.path.join(UPLOAD_DIR, safe_filename))
+    except Exception:
+        # Release the claim so the client can retry /complete
+        db.execute(update(UploadSession).where(UploadSession.id == session_id).values(completed_at=None))
+        db.commit()
+        raise
+
+    db_file = FileUpload(
+        filename=safe_filename,
+        file_type=upload.content_type,
+        owner_id=user.id
+    )
+    db.add(db_file)
+    db.delete(upload)
+    record_activity(db, user_id=user.id, uploads=1, upload_bytes=upload.total_size)
+    db.commit()
+    db.refresh(db_file)
+
+    return db_file
+
+
+@router.delete("/uploads/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+def abort_upload(
+    session_id: str,
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload)
+):
+    upload = _get_session(db, session_id, payload["user_id"])
+    db.delete(upload)
+    db.commit()
+    chunked_upload.discard_storage(session_id)
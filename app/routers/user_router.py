@@ -1,30 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session
 from typing import Optional
 
 from app.database import get_db
-from app.models.user_model import User
+from app.repositories import user_repository
 from app.schemas.user_schema import UserResponse
-from app.dependencies import get_current_user, admin_only
+from app.dependencies import get_token_payload, require_permissions, get_read_db
+from app.auth.permissions import Permission
+from app.core.http_cache import UserValidators, not_modified, principal_cache
+from app.utils.serialization import user_json, users_json
+from app.core.audit import audit_log
+from app.core import accounts
 
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 @router.get("/me", response_model=UserResponse)
-def read_current_user(data: dict = Depends(get_current_user)):
-    return data["user"]
+def read_current_user(request: Request, payload: dict = Depends(get_token_payload), db: Session = Depends(get_db)):
+    # Revalidation from the cached principal: no DB round trip, no serialization
+    cached = principal_cache.get(payload["user_id"])
+    if cached and cached.matches(request):
+        return not_modified(cached)
+
+    user = user_repository.get_user_row(db, payload["user_id"])
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    validators = principal_cache.put(user)
+    if validators.matches(request):
+        return not_modified(validators)
+    response = user_json(user)
+    response.headers.update(validators.headers())
+    return response
 
 @router.get("/{user_id}", response_model=UserResponse)
-def read_user(user_id: int, db: Session = Depends(get_db), data: dict = Depends(admin_only)):
-    user = db.query(User).filter(User.id == user_id).first()
+def read_user(user_id: int, request: Request, db: Session = Depends(get_read_db), data: dict = Depends(require_permissions(Permission.READ_USERS))):
+    cached = principal_cache.get(user_id)
+    if cached and cached.matches(request):
+        return not_modified(cached)
+
+    user = user_repository.get_user_row(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return user
+    validators = UserValidators.for_user(user)
+    if validators.matches(request):
+        return not_modified(validators)
+    response = user_json(user)
+    response.headers.update(validators.headers())
+    return response
 
 @router.get("/", response_model=list[UserResponse])
 def read_users(
-    db: Session = Depends(get_db),
-    data: dict = Depends(admin_only),
+    request: Request,
+    db: Session = Depends(get_read_db),
+    data: dict = Depends(require_permissions(Permission.READ_USERS)),
     # 🔍 SEARCH
     keyword: Optional[str] = Query(
         None, description="Search users by email"
@@ -41,32 +69,20 @@ def read_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100)
 ):
-    query = db.query(User)
-
-    # SEARCH
-    if keyword:
-        query = query.filter(User.email.ilike(f"%{keyword}%"))
-
-    # FILTER
-    if role:
-        query = query.filter(User.role == role)
-
-    # SORT
-    if sort == "asc":
-        query = query.order_by(User.id.asc())
-    else:
-        query = query.order_by(User.id.desc())
-
-    users = query.offset(skip).limit(limit).all()
-
-    return users
+    users = user_repository.list_user_rows(db, keyword, role, sort, skip, limit)
+    audit_log.record(
+        "users.list", actor_id=data["user_id"], request=request,
+        keyword=keyword, role=role, sort=sort, skip=skip, limit=limit, returned=len(users),
+    )
+    return users_json(users)
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: int, db: Session = Depends(get_db), data: dict = Depends(admin_only)):
-    user = db.query(User).filter(User.id == user_id).first()
+def delete_user(user_id: int, request: Request, db: Session = Depends(get_db), data: dict = Depends(require_permissions(Permission.DELETE_USERS))):
+    user = user_repository.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    db.delete(user)
-    db.commit()
+    # Soft delete; see POST /admin/users/{id}/reactivate
+    accounts.deactivate_user(db, user)
+    audit_log.record("user.delete", actor_id=data["user_id"], target_type="user", target_id=user_id, request=request, email=user.email)
     return
 
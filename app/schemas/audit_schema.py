@@ -0,0 +1,23 @@
+# schemas/audit_schema.py
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+class AuditEventOut(BaseModel):
+    id: int
+    created_at: datetime
+    actor_id: Optional[int] = Field(None, description="Acting user id; null for CLI/system actions")
+    action: str = Field(..., description="e.g. user.delete, users.list, admin.promote")
+    target_type: Optional[str] = None
+    target_id: Optional[str] = None
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    method: Optional[str] = None
+    path: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+
+    model_config = {"from_attributes": True}
+
+class AuditPage(BaseModel):
+    items: List[AuditEventOut]
+    next_before_id: Optional[int] = Field(None, description="Pass as before_id to fetch the next (older) page")
@@ -1,5 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import List, Tuple
+
+from app.config import UPLOAD_MAX_SIZE
 
 class FileResponse(BaseModel):
     id: int
@@ -8,3 +11,25 @@ class FileResponse(BaseModel):
     uploaded_at: datetime
 
     model_config = {"from_attributes": True}
+
+class UploadSessionCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255, description="Original file name")
+    content_type: str = Field("application/octet-stream", max_length=255)
+    total_size: int = Field(..., gt=0, le=UPLOAD_MAX_SIZE, description="File size in bytes")
+
+    model_config = {"extra": "forbid"}
+
+class UploadSessionOut(BaseModel):
+    id: str
+    chunk_size: int = Field(..., description="Send every chunk at this size (the last may be shorter)")
+    total_chunks: int
+    expires_at: datetime
+
+class UploadStatus(BaseModel):
+    id: str
+    total_size: int
+    chunk_size: int
+    total_chunks: int
+    received_chunks: List[Tuple[int, int]] = Field(..., description="Received chunk index ranges, inclusive")
+    missing_chunks: int
+    expires_at: datetime
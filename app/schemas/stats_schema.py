@@ -0,0 +1,13 @@
+# schemas/stats_schema.py
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List
+
+class TimeseriesPoint(BaseModel):
+    start: datetime = Field(..., description="Bucket start (UTC)")
+    value: int
+
+class Timeseries(BaseModel):
+    metric: str
+    bucket: str = Field(..., description="hour or day")
+    points: List[TimeseriesPoint] = Field(..., description="One point per bucket, oldest first; empty buckets are 0")
@@ -1,5 +1,8 @@
 # schemas/token_schema.py
 from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+
+from app.config import INTROSPECT_MAX_TOKENS
 
 class TokenPair(BaseModel):
     access_token: str = Field(..., description="Short-lived JWT access token")
@@ -13,3 +16,17 @@ class TokenOut(BaseModel):
     token_type: str = Field("bearer", description="Token type")
 
     model_config = {"extra": "forbid"}
+
+class IntrospectRequest(BaseModel):
+    tokens: List[str] = Field(..., min_length=1, max_length=INTROSPECT_MAX_TOKENS, description="Tokens to validate")
+    token_type: Literal["access", "refresh"] = Field("access", description="Kind of token in this batch")
+
+    model_config = {"extra": "forbid"}
+
+class TokenIntrospection(BaseModel):
+    active: bool = Field(..., description="True if the token is valid and its user is active")
+    claims: Optional[Dict[str, Any]] = Field(None, description="Decoded claims of an active token")
+    error: Optional[str] = Field(None, description="invalid / expired / revoked / user_not_found / user_inactive")
+
+class IntrospectResponse(BaseModel):
+    results: List[TokenIntrospection] = Field(..., description="One result per token, in request order")
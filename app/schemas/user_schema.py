@@ -1,6 +1,7 @@
 # schemas/user_schema.py
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter
 from typing import Optional
+from typing_extensions import TypedDict
 
 class UserCreate(BaseModel):
     email: EmailStr = Field(..., description="User's email address")
@@ -22,3 +23,16 @@ class UserResponse(BaseModel):
     model_config = {"from_attributes": True, "extra": "forbid"}
 
 
+# Serialization-only shape of UserResponse for rows already read from the DB.
+# Dumping a TypedDict skips model validation, so list endpoints serialize
+# selected columns straight to JSON instead of validating every ORM object.
+class UserRow(TypedDict):
+    id: int
+    email: str
+    full_name: Optional[str]
+    role: str
+    is_active: bool
+
+
+user_row_adapter = TypeAdapter(UserRow)
+user_rows_adapter = TypeAdapter(list[UserRow])
@@ -0,0 +1,216 @@
+# server.py
+"""
+Production launcher.
+
+Usage:
+    python -m app.server            (see Procfile)
+
+Sizes the worker count from the CPUs and memory actually available to this
+container, then serves app.main:app:
+
+- with gunicorn installed: gunicorn + UvicornWorker, app preloaded in the
+  parent so workers share its memory copy-on-write, and workers recycled
+  gracefully after MAX_REQUESTS (+ jitter) requests;
+- otherwise: uvicorn's own multi-process supervisor (no preloading).
+
+uvloop and httptools are used when installed (both are in
+requirements.txt on Linux/macOS; gunicorn is too, so preloading is the
+default there). All tuning comes from the settings in app.config
+(WEB_CONCURRENCY, KEEPALIVE_SECONDS, BACKLOG, ...).
+
+Some state lives in each worker process. With several workers, revoked
+access tokens are shared through a SQLite file (TOKEN_DENYLIST_PATH,
+defaulted to a file in the temp directory), and the principal cache is off
+unless PRINCIPAL_CACHE_SECONDS is set. Login circuit-breaker counts and
+read-your-writes pins stay per worker; see share_worker_state.
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import tempfile
+
+from app import config
+from app.logging_config import setup_logging
+
+from app.config import (
+    PORT,
+    WEB_CONCURRENCY,
+    WORKER_MEMORY_MB,
+    KEEPALIVE_SECONDS,
+    BACKLOG,
+    MAX_REQUESTS,
+    MAX_REQUESTS_JITTER,
+    GRACEFUL_TIMEOUT_SECONDS,
+)
+
+APP_PATH = "app.main:app"
+
+logger = logging.getLogger("app")
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: affinity mask, capped by a cgroup v2 quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def available_memory_mb() -> int | None:
+    """Memory limit of this container (cgroup v2), else total system memory."""
+    try:
+        with open("/sys/fs/cgroup/memory.max") as f:
+            limit = f.read().strip()
+        if limit != "max":
+            return int(limit) // (1024 * 1024)
+    except (OSError, ValueError):
+        pass
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def worker_count() -> int:
+    if WEB_CONCURRENCY > 0:
+        return WEB_CONCURRENCY
+    workers = available_cpus()
+    memory_mb = available_memory_mb()
+    if memory_mb:
+        workers = min(workers, memory_mb // WORKER_MEMORY_MB)
+    return max(1, workers)
+
+
+def share_worker_state(workers: int, port: int) -> None:
+    """Shares or flags per-process state before workers start."""
+    if workers <= 1:
+        return
+    if not config.TOKEN_DENYLIST_PATH:
+        # An in-memory denylist would honor a logout only in the worker
+        # that handled it
+        path = os.path.join(tempfile.gettempdir(), f"tokensafe-denylist-{port}.db")
+        # Spawned uvicorn workers read the environment; gunicorn preloads
+        # the app in this process, where app.config is already imported
+        os.environ["TOKEN_DENYLIST_PATH"] = path
+        config.TOKEN_DENYLIST_PATH = path
+        logger.info("TOKEN_DENYLIST_PATH not set; %d workers share revoked tokens via %s", workers, path)
+    if "PRINCIPAL_CACHE_SECONDS" not in os.environ:
+        # Only the worker that changed a user evicts its cached validators,
+        # so another worker could answer 304 for a stale role or profile
+        os.environ["PRINCIPAL_CACHE_SECONDS"] = "0"
+        config.PRINCIPAL_CACHE_SECONDS = 0
+    elif config.PRINCIPAL_CACHE_SECONDS > 0:
+        logger.warning(
+            "The principal cache is per worker: /users revalidation may be up to %ds stale",
+            config.PRINCIPAL_CACHE_SECONDS,
+        )
+    logger.warning(
+        "Login circuit-breaker counts are per worker: up to %d x LOGIN_GUARD_*_THRESHOLD failures before a lockout",
+        workers,
+    )
+    if config.DATABASE_REPLICA_URLS:
+        logger.warning("Read-your-writes pins are per worker: a user's next read may hit another worker and a replica")
+
+
+def event_loop() -> str:
+    return "uvloop" if _installed("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if _installed("httptools") else "h11"
+
+
+def run_gunicorn(host: str, port: int, workers: int) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    if _installed("uvicorn_worker"):
+        from uvicorn_worker import UvicornWorker
+    else:
+        from uvicorn.workers import UvicornWorker
+
+    class TunedUvicornWorker(UvicornWorker):
+        CONFIG_KWARGS = {"loop": event_loop(), "http": http_protocol()}
+
+    def post_fork(server, worker):
+        from app.auth.token_denylist import denylist
+        from app.database import reset_after_fork
+
+        reset_after_fork()
+        denylist.reset_after_fork()
+
+    class Application(BaseApplication):
+        def load_config(self):
+            settings = {
+                "bind": f"{host}:{port}",
+                "workers": workers,
+                "worker_class": TunedUvicornWorker,
+                "preload_app": True,
+                "keepalive": KEEPALIVE_SECONDS,
+                "backlog": BACKLOG,
+                "max_requests": MAX_REQUESTS,
+                "max_requests_jitter": MAX_REQUESTS_JITTER,
+                "graceful_timeout": GRACEFUL_TIMEOUT_SECONDS,
+                "post_fork": post_fork,
+            }
+            for key, value in settings.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    Application().run()
+
+
+def run_uvicorn(host: str, port: int, workers: int) -> None:
+    import uvicorn
+
+    uvicorn.run(
+        APP_PATH,
+        host=host,
+        port=port,
+        workers=workers,
+        loop=event_loop(),
+        http=http_protocol(),
+        backlog=BACKLOG,
+        timeout_keep_alive=KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT_SECONDS,
+        # Recycling needs a supervisor that restarts exited workers
+        limit_max_requests=(MAX_REQUESTS or None) if workers > 1 else None,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run TokenSafe with auto-sized workers.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=None, help="Override the computed worker count")
+    args = parser.parse_args()
+
+    setup_logging()
+    workers = args.workers or worker_count()
+    share_worker_state(workers, args.port)
+    server = "gunicorn" if _installed("gunicorn") else "uvicorn"
+    logger.info("%s: %d workers, loop=%s, http=%s", server, workers, event_loop(), http_protocol())
+
+    if server == "gunicorn":
+        run_gunicorn(args.host, args.port, workers)
+    else:
+        run_uvicorn(args.host, args.port, workers)
+
+
+if __name__ == "__main__":
+    main()
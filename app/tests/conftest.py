@@ -0,0 +1,28 @@
+import uuid
+
+from app.auth.jwt_handler import create_access_token
+from app.database import SessionLocal
+from app.models.user_model import User
+
+
+def create_user(role="user"):
+    db = SessionLocal()
+    try:
+        user = User(
+            email=f"test_{uuid.uuid4()}@example.com",
+            full_name="Test User",
+            hashed_password="not-a-real-hash",
+            role=role,
+            is_active=True,
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+    finally:
+        db.close()
+
+
+def auth_headers(user):
+    token = create_access_token({"user_id": user.id, "role": user.role})
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,131 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.activity import ActivityCollector, record_activity
+from app.database import SessionLocal
+from app.models.activity_rollup_model import ActiveUserMark, ActivityRollup
+from app.routers import file_router
+from app.tests.conftest import auth_headers, create_user
+
+client = TestClient(app)
+
+
+def _total(metric, bucket, headers):
+    now = datetime.utcnow()
+    response = client.get(
+        "/admin/stats/timeseries",
+        params={"metric": metric, "bucket": bucket, "from": (now - timedelta(days=1)).isoformat(),
+                "to": (now + timedelta(days=1)).isoformat()},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    return sum(point["value"] for point in response.json()["points"])
+
+
+def _totals(headers):
+    return {
+        (metric, bucket): _total(metric, bucket, headers)
+        for metric in ("registrations", "logins", "active_users")
+        for bucket in ("hour", "day")
+    }
+
+
+def test_register_login_and_refresh_are_rolled_up():
+    admin_headers = auth_headers(create_user(role="admin"))
+    before = _totals(admin_headers)
+
+    email = f"activity_{uuid.uuid4()}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "strongpassword123", "full_name": "A"})
+    tokens = client.post("/auth/login", data={"username": email, "password": "strongpassword123"}).json()
+    for _ in range(2):
+        response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 200
+
+    after = _totals(admin_headers)
+    for bucket in ("hour", "day"):
+        assert after["registrations", bucket] - before["registrations", bucket] == 1
+        assert after["logins", bucket] - before["logins", bucket] == 1
+        # Login and both refreshes are one active user
+        assert after["active_users", bucket] - before["active_users", bucket] == 1
+
+
+def test_uploads_count_files_and_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_router, "UPLOAD_DIR", str(tmp_path))
+    headers = auth_headers(create_user())
+    admin_headers = auth_headers(create_user(role="admin"))
+    before = _total("upload_bytes", "day", admin_headers), _total("uploads", "day", admin_headers)
+
+    response = client.post("/files/upload", files={"file": ("a.txt", b"x" * 1234, "text/plain")}, headers=headers)
+    assert response.status_code == 201
+
+    after = _total("upload_bytes", "day", admin_headers), _total("uploads", "day", admin_headers)
+    assert after[0] - before[0] == 1234
+    assert after[1] - before[1] == 1
+
+
+def test_timeseries_fills_empty_buckets_and_validates_range():
+    admin_headers = auth_headers(create_user(role="admin"))
+    db = SessionLocal()
+    try:
+        record_activity(db, at=datetime(2001, 2, 3, 4, 5), uploads=2)
+        record_activity(db, at=datetime(2001, 2, 3, 22, 0), uploads=3)
+        db.commit()
+    finally:
+        db.close()
+
+    params = {"metric": "uploads", "bucket": "day", "from": "2001-02-02T12:00:00", "to": "2001-02-05T00:00:00"}
+    body = client.get("/admin/stats/timeseries", params=params, headers=admin_headers).json()
+    assert [(p["start"], p["value"]) for p in body["points"]] == [
+        ("2001-02-02T00:00:00", 0),
+        ("2001-02-03T00:00:00", 5),
+        ("2001-02-04T00:00:00", 0),
+    ]
+
+    hourly = client.get(
+        "/admin/stats/timeseries", params={**params, "bucket": "hour"}, headers=admin_headers
+    ).json()["points"]
+    assert len(hourly) == 60
+    assert {p["start"]: p["value"] for p in hourly if p["value"]} == {
+        "2001-02-03T04:00:00": 2,
+        "2001-02-03T22:00:00": 3,
+    }
+
+    bad = {**params, "from": params["to"]}
+    assert client.get("/admin/stats/timeseries", params=bad, headers=admin_headers).status_code == 400
+    too_long = {**params, "bucket": "hour", "from": "2000-01-01T00:00:00"}
+    assert client.get("/admin/stats/timeseries", params=too_long, headers=admin_headers).status_code == 400
+    unknown = {**params, "metric": "pageviews"}
+    assert client.get("/admin/stats/timeseries", params=unknown, headers=admin_headers).status_code == 422
+    user_headers = auth_headers(create_user())
+    assert client.get("/admin/stats/timeseries", params=params, headers=user_headers).status_code == 403
+
+
+@pytest.mark.parametrize("retention_days, hourly_left", [(90, 0), (0, 1)])
+def test_collector_drops_closed_marks_and_old_hourly_rollups(retention_days, hourly_left):
+    user = create_user()
+    at = datetime(2002, 6, 7, 8, 9)
+    db = SessionLocal()
+    try:
+        assert record_activity(db, user_id=user.id, at=at)
+        db.commit()
+    finally:
+        db.close()
+
+    ActivityCollector(SessionLocal, hourly_retention_days=retention_days).run_once()
+
+    db = SessionLocal()
+    try:
+        assert db.query(ActiveUserMark).filter(ActiveUserMark.user_id == user.id).count() == 0
+        rollups = db.query(ActivityRollup).filter(ActivityRollup.bucket_start == datetime(2002, 6, 7, 8))
+        assert rollups.filter(ActivityRollup.bucket == "hour").count() == hourly_left
+        # Daily counters are never dropped
+        day = db.get(ActivityRollup, ("active_users", "day", datetime(2002, 6, 7)))
+        assert day is not None and day.value >= 1
+        db.query(ActivityRollup).filter(ActivityRollup.bucket_start < datetime(2003, 1, 1)).delete()
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,84 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.core.audit import AuditWriter, audit_log
+from app.models.audit_log_model import AuditLog
+from app.tests.conftest import auth_headers, create_user
+
+client = TestClient(app)
+
+
+def test_admin_delete_is_audited_and_queryable():
+    admin = create_user(role="admin")
+    victim = create_user()
+
+    response = client.delete(f"/admin/users/{victim.id}", headers=auth_headers(admin))
+    assert response.status_code == 204
+    audit_log.flush()
+
+    response = client.get(
+        "/admin/audit",
+        params={"action": "user.delete", "target_id": str(victim.id)},
+        headers=auth_headers(admin),
+    )
+    assert response.status_code == 200
+    [entry] = response.json()["items"]
+    assert entry["actor_id"] == admin.id
+    assert entry["target_type"] == "user"
+    assert entry["details"] == {"email": victim.email}
+    assert entry["method"] == "DELETE"
+
+
+def test_audit_pages_newest_first():
+    admin = create_user(role="admin")
+    for _ in range(3):
+        client.get("/admin/users", headers=auth_headers(admin))
+    audit_log.flush()
+
+    params = {"actor_id": admin.id, "limit": 2}
+    first = client.get("/admin/audit", params=params, headers=auth_headers(admin)).json()
+    assert len(first["items"]) == 2
+    second = client.get(
+        "/admin/audit", params={**params, "before_id": first["next_before_id"]}, headers=auth_headers(admin)
+    ).json()
+    assert len(second["items"]) == 1
+    assert second["next_before_id"] is None
+
+    ids = [e["id"] for e in first["items"] + second["items"]]
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_audit_requires_permission():
+    user = create_user()
+    response = client.get("/admin/audit", headers=auth_headers(user))
+    assert response.status_code == 403
+
+
+def test_writer_batches_and_writes_through_when_full():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    AuditLog.__table__.create(engine)
+    inserts = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            inserts.append(statement)
+
+    writer = AuditWriter(engine, queue_size=2, batch_size=100, enqueue_timeout=0.01)
+    # Hold the background thread back so the queue fills up
+    writer._ensure_started = lambda: None
+    for i in range(3):
+        writer.record("test.event", actor_id=i)
+    assert len(inserts) == 1  # the third event found the queue full
+
+    del writer._ensure_started
+    writer.start()
+    writer.flush()
+    writer.stop()
+
+    # The two queued events went out in one multi-row INSERT
+    assert len(inserts) == 2
+    with engine.connect() as conn:
+        assert sorted(conn.execute(select(AuditLog.actor_id)).scalars()) == [0, 1, 2]
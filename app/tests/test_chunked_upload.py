@@ -0,0 +1,182 @@
+import fcntl
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core import chunked_upload
+from app.core.chunked_upload import UploadSessionCollector
+from app.database import SessionLocal
+from app.models.upload_session_model import UploadSession
+from app.routers import file_router
+from app.tests.conftest import auth_headers, create_user
+
+client = TestClient(app)
+
+CONTENT = b"0123456789"  # three chunks of 4, 4 and 2 bytes
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_router, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(file_router, "UPLOAD_CHUNK_SIZE", 4)
+    monkeypatch.setattr(chunked_upload, "SESSIONS_DIR", str(tmp_path / "sessions"))
+    return tmp_path
+
+
+def _start_upload(headers):
+    response = client.post(
+        "/files/uploads",
+        json={"filename": "notes.txt", "content_type": "text/plain", "total_size": len(CONTENT)},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def _put(session_id, index, data, headers):
+    return client.put(f"/files/uploads/{session_id}/chunks/{index}", content=data, headers=headers)
+
+
+def test_out_of_order_chunks_resume_and_assemble(storage):
+    headers = auth_headers(create_user())
+    session = _start_upload(headers)
+    assert session["total_chunks"] == 3
+
+    assert _put(session["id"], 2, CONTENT[8:], headers).status_code == 204
+    assert _put(session["id"], 0, CONTENT[:4], headers).status_code == 204
+
+    status = client.get(f"/files/uploads/{session['id']}", headers=headers).json()
+    assert status["received_chunks"] == [[0, 0], [2, 2]]
+    assert status["missing_chunks"] == 1
+    assert client.post(f"/files/uploads/{session['id']}/complete", headers=headers).status_code == 409
+
+    assert _put(session["id"], 1, CONTENT[4:8], headers).status_code == 204
+    response = client.post(f"/files/uploads/{session['id']}/complete", headers=headers)
+    assert response.status_code == 201
+    assert response.json()["file_type"] == "text/plain"
+
+    with open(storage / response.json()["filename"], "rb") as f:
+        assert f.read() == CONTENT
+    assert not os.path.exists(storage / "sessions" / session["id"])
+    # A finished session is gone
+    assert client.get(f"/files/uploads/{session['id']}", headers=headers).status_code == 404
+
+
+def test_chunk_size_and_owner_are_checked(storage):
+    owner_headers = auth_headers(create_user())
+    session = _start_upload(owner_headers)
+
+    assert _put(session["id"], 0, b"abc", owner_headers).status_code == 400
+    assert _put(session["id"], 3, b"ab", owner_headers).status_code == 400
+    assert _put(session["id"], 0, CONTENT[:4], auth_headers(create_user())).status_code == 404
+
+
+def test_collector_removes_expired_sessions(storage):
+    headers = auth_headers(create_user())
+    session = _start_upload(headers)
+    _put(session["id"], 0, CONTENT[:4], headers)
+
+    db = SessionLocal()
+    try:
+        db.get(UploadSession, session["id"]).expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+    finally:
+        db.close()
+
+    assert UploadSessionCollector(SessionLocal).run_once() >= 1
+    assert not os.path.exists(storage / "sessions" / session["id"])
+    db = SessionLocal()
+    try:
+        assert db.get(UploadSession, session["id"]) is None
+    finally:
+        db.close()
+
+
+def test_unsafe_file_names_keep_no_path_parts(storage):
+    headers = auth_headers(create_user())
+    response = client.post(
+        "/files/uploads",
+        json={"filename": "report.v2/final", "total_size": len(CONTENT)},
+        headers=headers,
+    )
+    session = response.json()
+    for index in range(3):
+        _put(session["id"], index, CONTENT[index * 4:index * 4 + 4], headers)
+
+    response = client.post(f"/files/uploads/{session['id']}/complete", headers=headers)
+    assert response.status_code == 201
+    stored = response.json()["filename"]
+    assert "/" not in stored and "." not in stored
+    assert (storage / stored).read_bytes() == CONTENT
+
+
+def test_failed_assembly_can_be_retried(storage, monkeypatch):
+    headers = auth_headers(create_user())
+    session = _start_upload(headers)
+    for index in range(3):
+        _put(session["id"], index, CONTENT[index * 4:index * 4 + 4], headers)
+
+    def fail(session_id, destination):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(chunked_upload, "assemble", fail)
+        with pytest.raises(OSError):
+            client.post(f"/files/uploads/{session['id']}/complete", headers=headers)
+
+    response = client.post(f"/files/uploads/{session['id']}/complete", headers=headers)
+    assert response.status_code == 201
+    assert (storage / response.json()["filename"]).read_bytes() == CONTENT
+
+
+@pytest.mark.parametrize("finish", ["assemble", "discard"])
+def test_storage_waits_for_chunk_writes_in_progress(storage, finish):
+    chunked_upload.create_storage("race", len(CONTENT))
+    fd = os.open(storage / "sessions" / "race" / "data", os.O_RDONLY)
+    # A chunk write holding its shared lock
+    fcntl.flock(fd, fcntl.LOCK_SH)
+    if finish == "assemble":
+        worker = threading.Thread(target=chunked_upload.assemble, args=("race", str(storage / "done")))
+    else:
+        worker = threading.Thread(target=chunked_upload.discard_storage, args=("race",))
+    worker.start()
+    worker.join(0.2)
+    assert worker.is_alive()
+    assert os.path.exists(storage / "sessions" / "race" / "data")
+    os.close(fd)
+    worker.join(5)
+
+    # Later writes find the file gone instead of writing into it
+    with pytest.raises(chunked_upload.StorageGone):
+        chunked_upload.write_chunk("race", 0, 0, CONTENT[:4])
+    if finish == "assemble":
+        assert (storage / "done").read_bytes() == bytes(len(CONTENT))
+    assert not os.path.exists(storage / "sessions" / "race")
+
+
+def test_chunk_racing_complete_is_rejected(storage, monkeypatch):
+    headers = auth_headers(create_user())
+    session = _start_upload(headers)
+    for index in range(3):
+        _put(session["id"], index, CONTENT[index * 4:index * 4 + 4], headers)
+
+    expected_chunk_size = chunked_upload.expected_chunk_size
+
+    def claim_meanwhile(*args):
+        # /complete claims the session while this chunk's body streams in
+        db = SessionLocal()
+        try:
+            db.get(UploadSession, session["id"]).completed_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+        return expected_chunk_size(*args)
+
+    monkeypatch.setattr(chunked_upload, "expected_chunk_size", claim_meanwhile)
+    assert _put(session["id"], 0, b"XXXX", headers).status_code == 404
+    with open(storage / "sessions" / session["id"] / "data", "rb") as f:
+        assert f.read() == CONTENT
@@ -0,0 +1,150 @@
+import smtplib
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlparse
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.email_outbox import CLAIM_TIMEOUT_SECONDS, OutboxSender, enqueue_email
+from app.database import SessionLocal
+from app.models.email_outbox_model import EmailOutbox
+from app.models.user_model import User
+
+client = TestClient(app)
+
+
+class FakeSMTP:
+    """Stands in for an SMTP server; records what was sent."""
+
+    def __init__(self, reject=()):
+        self.sent = []
+        self.reject = set(reject)
+
+    def send_message(self, message):
+        if message["To"] in self.reject:
+            raise smtplib.SMTPRecipientsRefused({message["To"]: (550, b"no such user")})
+        self.sent.append(message)
+
+    def quit(self):
+        pass
+
+
+def _register():
+    email = f"test_{uuid.uuid4()}@example.com"
+    response = client.post(
+        "/auth/register",
+        json={"email": email, "password": "strongpassword123", "full_name": "Test User"},
+    )
+    assert response.status_code == 201
+    return email
+
+
+def _verification_token(email):
+    db = SessionLocal()
+    try:
+        message = db.query(EmailOutbox).filter(EmailOutbox.recipient == email).one()
+        link = next(line for line in message.body.splitlines() if "/auth/verify-email?" in line)
+        return parse_qs(urlparse(link).query)["token"][0]
+    finally:
+        db.close()
+
+
+def test_register_queues_email_and_link_verifies_user():
+    email = _register()
+    token = _verification_token(email)
+
+    response = client.get("/auth/verify-email", params={"token": token})
+    assert response.status_code == 200
+    # Following the link twice is harmless
+    assert client.get("/auth/verify-email", params={"token": token}).status_code == 200
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == email).one()
+        assert user.is_verified is True
+        assert user.email_verified_at is not None
+    finally:
+        db.close()
+
+
+def test_verify_email_rejects_bad_token():
+    response = client.get("/auth/verify-email", params={"token": "not-a-token"})
+    assert response.status_code == 400
+
+
+def test_sender_reuses_one_connection_per_batch():
+    recipients = [f"test_{uuid.uuid4()}@example.com" for _ in range(3)]
+    db = SessionLocal()
+    try:
+        for recipient in recipients:
+            enqueue_email(db, recipient, "Hello", "Body")
+        db.commit()
+    finally:
+        db.close()
+
+    smtp = FakeSMTP(reject=[recipients[1]])
+    connections = []
+
+    def factory():
+        connections.append(smtp)
+        return smtp
+
+    sender = OutboxSender(SessionLocal, smtp_factory=factory, batch_size=1000)
+    sender.run_once()
+
+    sent_to = {message["To"] for message in smtp.sent}
+    assert recipients[0] in sent_to and recipients[2] in sent_to
+    # A rejected recipient does not cost the connection
+    assert len(connections) == 1
+
+    db = SessionLocal()
+    try:
+        rejected = db.query(EmailOutbox).filter(EmailOutbox.recipient == recipients[1]).one()
+        assert rejected.sent_at is None
+        assert rejected.attempts == 1
+        assert rejected.next_attempt_at is not None
+    finally:
+        db.close()
+
+
+def test_claimed_messages_are_not_sent_by_another_sender():
+    recipients = [f"test_{uuid.uuid4()}@example.com" for _ in range(2)]
+    db = SessionLocal()
+    try:
+        for recipient in recipients:
+            enqueue_email(db, recipient, "Hello", "Body")
+        db.commit()
+    finally:
+        db.close()
+
+    first_smtp, second_smtp = FakeSMTP(), FakeSMTP()
+    first = OutboxSender(SessionLocal, smtp_factory=lambda: first_smtp, batch_size=1000)
+    second = OutboxSender(SessionLocal, smtp_factory=lambda: second_smtp, batch_size=1000)
+
+    # The first sender (another worker) claims the batch; the second skips it
+    db = SessionLocal()
+    try:
+        token = first.claim(db, datetime.utcnow())
+    finally:
+        db.close()
+    second.run_once()
+    assert not {m["To"] for m in second_smtp.sent} & set(recipients)
+
+    # A claim abandoned for longer than CLAIM_TIMEOUT_SECONDS is taken over
+    db = SessionLocal()
+    try:
+        db.query(EmailOutbox).filter(EmailOutbox.claimed_by == token).update(
+            {"claimed_at": datetime.utcnow() - timedelta(seconds=CLAIM_TIMEOUT_SECONDS + 1)}
+        )
+        db.commit()
+    finally:
+        db.close()
+    second.run_once()
+    assert set(recipients) <= {m["To"] for m in second_smtp.sent}
+
+    db = SessionLocal()
+    try:
+        rows = db.query(EmailOutbox).filter(EmailOutbox.recipient.in_(recipients)).all()
+        assert all(row.sent_at is not None and row.claimed_by is None for row in rows)
+    finally:
+        db.close()
@@ -0,0 +1,21 @@
+import app.utils.hash as hash_utils
+
+
+def test_rehash_when_cost_changes(monkeypatch):
+    monkeypatch.setattr(hash_utils, "pwd_context", hash_utils.build_context("bcrypt", 4))
+    old_hash = hash_utils.hash_password("strongpassword123")
+
+    valid, new_hash = hash_utils.verify_and_rehash("strongpassword123", old_hash)
+    assert valid and new_hash is None
+
+    monkeypatch.setattr(hash_utils, "pwd_context", hash_utils.build_context("bcrypt", 5))
+    valid, new_hash = hash_utils.verify_and_rehash("strongpassword123", old_hash)
+    assert valid
+    assert new_hash.startswith("$2b$05$")
+    assert hash_utils.verify_password("strongpassword123", new_hash)
+
+
+def test_wrong_password_is_not_rehashed(monkeypatch):
+    monkeypatch.setattr(hash_utils, "pwd_context", hash_utils.build_context("bcrypt", 4))
+    old_hash = hash_utils.hash_password("strongpassword123")
+    assert hash_utils.verify_and_rehash("wrongpassword", old_hash) == (False, None)
@@ -0,0 +1,55 @@
+import uuid
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import SessionLocal
+from app.models.user_model import User
+from app.auth.jwt_handler import create_access_token, revoke_user_access_tokens
+import app.dependencies as dependencies
+
+client = TestClient(app)
+
+def test_introspect_batch(monkeypatch):
+    monkeypatch.setattr(dependencies, "SERVICE_API_KEYS", ["gateway-key"])
+    db = SessionLocal()
+    try:
+        active = User(email=f"test_{uuid.uuid4()}@example.com", hashed_password="x", role="user", is_active=True)
+        inactive = User(email=f"test_{uuid.uuid4()}@example.com", hashed_password="x", role="user", is_active=False)
+        db.add_all([active, inactive])
+        db.commit()
+        tokens = [
+            create_access_token({"user_id": active.id, "role": "user"}),
+            create_access_token({"user_id": inactive.id, "role": "user"}),
+            "not-a-token",
+        ]
+    finally:
+        db.close()
+
+    response = client.post("/auth/introspect", json={"tokens": tokens}, headers={"X-API-Key": "gateway-key"})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["active"] is True
+    assert results[0]["claims"]["role"] == "user"
+    assert results[1] == {"active": False, "claims": None, "error": "user_inactive"}
+    assert results[2]["error"] == "invalid"
+
+def test_introspect_reports_revoked_access_tokens(monkeypatch):
+    monkeypatch.setattr(dependencies, "SERVICE_API_KEYS", ["gateway-key"])
+    db = SessionLocal()
+    try:
+        user = User(email=f"test_{uuid.uuid4()}@example.com", hashed_password="x", role="user", is_active=True)
+        db.add(user)
+        db.commit()
+        old = create_access_token({"user_id": user.id, "role": "user"})
+        revoke_user_access_tokens(user.id)
+    finally:
+        db.close()
+
+    response = client.post("/auth/introspect", json={"tokens": [old]}, headers={"X-API-Key": "gateway-key"})
+
+    assert response.json()["results"][0]["error"] == "revoked"
+
+def test_introspect_requires_service_key(monkeypatch):
+    monkeypatch.setattr(dependencies, "SERVICE_API_KEYS", ["gateway-key"])
+    response = client.post("/auth/introspect", json={"tokens": ["x"]}, headers={"X-API-Key": "wrong"})
+    assert response.status_code == 403
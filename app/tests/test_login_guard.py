@@ -0,0 +1,37 @@
+from app.core.login_guard import DecayingCountMinSketch, LoginGuard, subnet_of
+
+
+def test_sketch_counts_and_discounts():
+    sketch = DecayingCountMinSketch(width=1024, depth=4, half_life_seconds=3600)
+    for _ in range(3):
+        sketch.add("victim@example.com")
+
+    assert 2.9 < sketch.estimate("victim@example.com") <= 3.0
+    assert sketch.estimate("someone@example.com") < 1
+
+    sketch.discount("victim@example.com")
+    assert sketch.estimate("victim@example.com") < 0.01
+
+
+def test_account_locked_after_threshold_until_success():
+    guard = LoginGuard(account_threshold=3, subnet_threshold=100, half_life_seconds=60)
+    for _ in range(2):
+        guard.record_failure("Victim@example.com", "10.0.0.1")
+    assert guard.check("victim@example.com", "10.0.0.1") is None
+
+    guard.record_failure("victim@example.com", "10.0.0.2")
+    scope, retry_after = guard.check("victim@example.com", "192.168.1.1")
+    assert scope == "account" and retry_after >= 1
+
+    guard.record_success("victim@example.com")
+    assert guard.check("victim@example.com", "192.168.1.1") is None
+
+
+def test_subnet_locked_across_accounts():
+    guard = LoginGuard(account_threshold=100, subnet_threshold=5, half_life_seconds=60)
+    for i in range(5):
+        guard.record_failure(f"user{i}@example.com", f"203.0.113.{i}")
+
+    assert guard.check("fresh@example.com", "203.0.113.200")[0] == "subnet"
+    assert guard.check("fresh@example.com", "198.51.100.1") is None
+    assert subnet_of("2001:db8::1") == "2001:db8::/64"
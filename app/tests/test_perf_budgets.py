@@ -0,0 +1,66 @@
+import json
+import os
+
+from app.benchmarks import suite
+
+# Default runs skip the bcrypt-bound benchmarks (seconds of hashing, and the
+# noisiest ratios) and allow twice the recorded tolerance for machine load;
+# RUN_PERF_BUDGETS=1 checks everything at the recorded budgets (quiet
+# machine or a dedicated CI job)
+FULL_BUDGETS = os.getenv("RUN_PERF_BUDGETS") == "1"
+DEFAULT_HEADROOM = 2.0
+
+
+def test_hot_primitives_stay_within_budget():
+    results = suite.run_suite(include_hashing=FULL_BUDGETS)
+    # Machine-readable results, e.g. for CI artifacts
+    output = os.getenv("BENCHMARK_OUTPUT")
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    headroom = 1.0 if FULL_BUDGETS else DEFAULT_HEADROOM
+    regressions, _ = suite.compare(results, suite.load_baseline(), headroom=headroom)
+    assert not regressions, (
+        "Performance budget exceeded (re-record with `python -m app.benchmarks.suite "
+        "--update-baseline` only if the slowdown is intended):\n" + "\n".join(regressions)
+    )
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = {
+        "hashing": {"scheme": "bcrypt", "bcrypt_rounds": 12},
+        "benchmarks": {
+            "fast": {"us": 10, "relative": 1.0, "tolerance": 1.5},
+            "slow": {"us": 10, "relative": 1.0, "tolerance": 1.5},
+            "hash_password": {"us": 10, "relative": 1.0, "tolerance": 2.0},
+        },
+    }
+    results = {
+        "hashing": {"scheme": "bcrypt", "bcrypt_rounds": 13},
+        "benchmarks": {
+            "fast": {"us": 14, "relative": 1.4, "tolerance": 1.5},
+            "slow": {"us": 20, "relative": 2.0, "tolerance": 1.5},
+            "hash_password": {"us": 40, "relative": 4.0, "tolerance": 2.0},
+        },
+    }
+
+    regressions, skipped = suite.compare(results, baseline)
+
+    assert [line.split(":")[0] for line in regressions] == ["slow"]
+    # A deliberate cost change is not a regression
+    assert [line.split(":")[0] for line in skipped] == ["hash_password"]
+
+
+def test_headroom_scales_every_tolerance():
+    baseline = {
+        "hashing": {"scheme": "bcrypt", "bcrypt_rounds": 12},
+        "benchmarks": {"fast": {"us": 10, "relative": 1.0, "tolerance": 1.5}},
+    }
+    results = {
+        "hashing": {"scheme": "bcrypt", "bcrypt_rounds": 12},
+        "benchmarks": {"fast": {"us": 20, "relative": 2.0, "tolerance": 1.5}},
+    }
+
+    assert suite.compare(results, baseline)[0]
+    assert not suite.compare(results, baseline, headroom=2.0)[0]
@@ -0,0 +1,36 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import ReplicaRouter
+
+
+def _router(tmp_path, replica_url):
+    primary_engine = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    primary = sessionmaker(bind=primary_engine)
+    router = ReplicaRouter(primary, [create_engine(replica_url)], health_check_seconds=60, sticky_seconds=60)
+    return router, primary_engine
+
+
+def test_reads_go_to_healthy_replica(tmp_path):
+    router, primary_engine = _router(tmp_path, f"sqlite:///{tmp_path / 'replica.db'}")
+
+    db = router.session(user_id=1)
+    assert db.get_bind() is router.replica_engines[0]
+    db.close()
+
+
+def test_falls_back_to_primary_when_replica_is_down(tmp_path):
+    router, primary_engine = _router(tmp_path, f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+
+    db = router.session(user_id=1)
+    assert db.get_bind() is primary_engine
+    db.close()
+
+
+def test_user_reads_stick_to_primary_after_write(tmp_path):
+    router, primary_engine = _router(tmp_path, f"sqlite:///{tmp_path / 'replica.db'}")
+
+    router.mark_write(1)
+
+    assert router.session(user_id=1).get_bind() is primary_engine
+    assert router.session(user_id=2).get_bind() is router.replica_engines[0]
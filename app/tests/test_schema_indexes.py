@@ -0,0 +1,29 @@
+from sqlalchemy import ForeignKeyConstraint
+
+from app.db_base import Base
+import app.database  # noqa: F401 (registers all models on Base.metadata)
+
+
+def _indexed_column_prefixes(table):
+    """Column-name tuples usable as a leading index prefix on this table."""
+    prefixes = []
+    for index in table.indexes:
+        prefixes.append(tuple(c.name for c in index.columns))
+    for constraint in table.constraints:
+        if isinstance(constraint, ForeignKeyConstraint):
+            continue
+        columns = tuple(c.name for c in getattr(constraint, "columns", []))
+        if columns:
+            prefixes.append(columns)
+    return prefixes
+
+
+def test_every_foreign_key_has_a_covering_index():
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        prefixes = _indexed_column_prefixes(table)
+        for fk in table.foreign_key_constraints:
+            fk_columns = tuple(c.name for c in fk.columns)
+            if not any(p[:len(fk_columns)] == fk_columns for p in prefixes):
+                missing.append(f"{table.name}({', '.join(fk_columns)})")
+    assert not missing, f"Foreign keys without a covering index: {missing}"
@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+from app import config, server
+
+
+@pytest.fixture
+def launcher_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("TOKEN_DENYLIST_PATH", str(tmp_path / "denylist.db"))
+    monkeypatch.setattr(config, "TOKEN_DENYLIST_PATH", str(tmp_path / "denylist.db"))
+    monkeypatch.setattr(config, "PRINCIPAL_CACHE_SECONDS", 30)
+    monkeypatch.delenv("PRINCIPAL_CACHE_SECONDS", raising=False)
+    return monkeypatch
+
+
+def test_several_workers_disable_the_principal_cache_by_default(launcher_env):
+    server.share_worker_state(1, 8000)
+    assert config.PRINCIPAL_CACHE_SECONDS == 30
+
+    server.share_worker_state(4, 8000)
+    assert config.PRINCIPAL_CACHE_SECONDS == 0
+    assert os.environ["PRINCIPAL_CACHE_SECONDS"] == "0"
+
+
+def test_explicit_principal_cache_is_kept(launcher_env):
+    launcher_env.setenv("PRINCIPAL_CACHE_SECONDS", "30")
+    server.share_worker_state(4, 8000)
+    assert config.PRINCIPAL_CACHE_SECONDS == 30
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app.main import app
+from app.core.user_purge import UserPurger
+from app.database import SessionLocal
+from app.models.refresh_token_model import RefreshToken
+from app.models.user_model import User
+from app.utils.hash import hash_password
+from app.tests.conftest import auth_headers, create_user
+
+client = TestClient(app)
+
+
+def test_deactivated_user_is_hidden_until_reactivated():
+    admin = create_user(role="admin")
+    user = create_user()
+    headers, user_headers = auth_headers(admin), auth_headers(user)
+
+    assert client.post(f"/admin/users/{user.id}/deactivate", headers=headers).status_code == 204
+
+    assert client.get(f"/users/{user.id}", headers=headers).status_code == 404
+    # Access tokens issued before deactivation are revoked
+    assert client.get("/users/me", headers=user_headers).status_code == 401
+    listed = client.get("/admin/users", params={"keyword": user.email}, headers=headers).json()
+    assert listed == []
+
+    response = client.post(f"/admin/users/{user.id}/reactivate", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["is_active"] is True
+    assert client.get(f"/users/{user.id}", headers=headers).status_code == 200
+
+
+def test_deactivated_admin_loses_rights_at_once():
+    admin_a, admin_b = create_user(role="admin"), create_user(role="admin")
+    headers_a = auth_headers(admin_a)
+    victim = create_user()
+
+    assert client.post(f"/admin/users/{admin_a.id}/deactivate", headers=auth_headers(admin_b)).status_code == 204
+
+    response = client.delete(f"/admin/users/{victim.id}", headers=headers_a)
+    assert response.status_code == 401
+    assert client.get("/admin/stats", headers=headers_a).status_code == 401
+    assert client.get(f"/users/{victim.id}", headers=auth_headers(admin_b)).status_code == 200
+
+
+def test_admin_deleted_through_users_route_loses_rights_at_once():
+    admin_a, admin_b = create_user(role="admin"), create_user(role="admin")
+    headers_a = auth_headers(admin_a)
+
+    assert client.delete(f"/users/{admin_a.id}", headers=auth_headers(admin_b)).status_code == 204
+
+    assert client.get("/admin/stats", headers=headers_a).status_code == 401
+    assert client.get("/admin/users", headers=headers_a).status_code == 401
+
+
+def test_tokens_issued_after_reactivation_are_accepted():
+    admin = create_user(role="admin")
+    user = create_user()
+    headers = auth_headers(admin)
+
+    assert client.post(f"/admin/users/{user.id}/deactivate", headers=headers).status_code == 204
+    assert client.post(f"/admin/users/{user.id}/reactivate", headers=headers).status_code == 200
+    # Same second as the revocation is fine
+    assert client.get("/users/me", headers=auth_headers(user)).status_code == 200
+
+
+def test_deactivated_user_cannot_log_in():
+    admin = create_user(role="admin")
+    db = SessionLocal()
+    try:
+        user = User(email=f"soft_{admin.id}@example.com", hashed_password=hash_password("strongpassword123"), role="user")
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+    finally:
+        db.close()
+
+    client.post(f"/admin/users/{user.id}/deactivate", headers=auth_headers(admin))
+    response = client.post("/auth/login", data={"username": user.email, "password": "strongpassword123"})
+    assert response.status_code == 401
+
+
+def test_email_unique_among_live_users_only():
+    admin = create_user(role="admin")
+    old = create_user()
+    client.delete(f"/admin/users/{old.id}", headers=auth_headers(admin))
+
+    # The address is free again once its account is deactivated
+    response = client.post(
+        "/auth/register",
+        json={"email": old.email, "password": "strongpassword123", "full_name": "New Owner"},
+    )
+    assert response.status_code == 201
+
+    response = client.post(f"/admin/users/{old.id}/reactivate", headers=auth_headers(admin))
+    assert response.status_code == 409
+
+    db = SessionLocal()
+    try:
+        db.add(User(email=old.email, hashed_password="x", role="user"))
+        with pytest.raises(IntegrityError):
+            db.commit()
+    finally:
+        db.close()
+
+
+def test_purge_deletes_only_long_deactivated_users():
+    stale, recent = create_user(), create_user()
+    db = SessionLocal()
+    try:
+        for user, deactivated in ((stale, datetime.utcnow() - timedelta(days=31)), (recent, datetime.utcnow())):
+            row = db.get(User, user.id)
+            row.is_active = False
+            row.deleted_at = deactivated
+        db.add(RefreshToken(token=f"purge-{stale.id}", user_id=stale.id, expires_at=datetime.utcnow()))
+        db.commit()
+    finally:
+        db.close()
+
+    purger = UserPurger(SessionLocal, after_days=30, batch_size=1000)
+    assert purger.run_once() >= 1
+
+    db = SessionLocal()
+    try:
+        assert db.get(User, stale.id) is None
+        assert db.get(User, recent.id) is not None
+        assert db.query(RefreshToken).filter(RefreshToken.user_id == stale.id).count() == 0
+    finally:
+        db.close()
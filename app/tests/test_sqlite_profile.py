@@ -0,0 +1,106 @@
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.db_base import Base
+from app.db_sqlite import (
+    SQLiteMaintenance,
+    SQLiteRoutingSession,
+    create_reader_engine,
+    create_writer_engine,
+    is_file_sqlite,
+)
+from app.models.refresh_token_model import RefreshToken
+from app.models.user_model import User
+import app.database  # noqa: F401 (registers every model on Base.metadata)
+
+
+def _tuned(tmp_path):
+    url = f"sqlite:///{tmp_path / 'tuned.db'}"
+    writer = create_writer_engine(url)
+    reader = create_reader_engine(url, pool_size=4)
+    Base.metadata.create_all(bind=writer)
+    return writer, reader, sessionmaker(class_=SQLiteRoutingSession, bind=writer, reader=reader, autoflush=False)
+
+
+def test_connections_are_tuned(tmp_path):
+    writer, reader, _ = _tuned(tmp_path)
+    with writer.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+    with reader.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA query_only").scalar() == 1
+        assert conn.exec_driver_sql("PRAGMA mmap_size").scalar() > 0
+
+    assert is_file_sqlite("sqlite:///./app.db")
+    assert not is_file_sqlite("sqlite://")
+    assert not is_file_sqlite("sqlite:///:memory:")
+    assert not is_file_sqlite("postgresql://db/app")
+
+
+def test_session_reads_from_pool_and_writes_through_writer(tmp_path):
+    writer, reader, Session = _tuned(tmp_path)
+    db = Session()
+    try:
+        assert db.get_bind(clause=text("SELECT 1")) is reader
+        db.add(User(email="route@example.com", hashed_password="x", role="user"))
+        db.flush()
+        # After its first write the transaction reads its own changes
+        assert db.get_bind(clause=text("SELECT 1")) is writer
+        assert db.query(User).filter(User.email == "route@example.com").count() == 1
+        db.commit()
+        assert db.get_bind(clause=text("SELECT 1")) is reader
+        assert db.query(User).filter(User.email == "route@example.com").count() == 1
+    finally:
+        db.close()
+
+
+def test_concurrent_writers_do_not_hit_database_locked(tmp_path):
+    _, _, Session = _tuned(tmp_path)
+    db = Session()
+    db.add(User(email="busy@example.com", hashed_password="x", role="user"))
+    db.commit()
+    user_id = db.query(User.id).scalar()
+    db.close()
+    errors = []
+
+    def login(n):
+        for i in range(20):
+            db = Session()
+            try:
+                user = db.get(User, user_id)
+                user.last_login_at = datetime.utcnow()
+                db.add(RefreshToken(token=f"t-{n}-{i}", user_id=user.id, expires_at=datetime.utcnow() + timedelta(days=1)))
+                db.commit()
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=login, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    db = Session()
+    try:
+        assert db.query(RefreshToken).count() == 160
+    finally:
+        db.close()
+
+
+def test_maintenance_checkpoints_the_wal(tmp_path):
+    writer, _, Session = _tuned(tmp_path)
+    db = Session()
+    db.add(User(email="wal@example.com", hashed_password="x", role="user"))
+    db.commit()
+    db.close()
+
+    busy, wal_pages, checkpointed = SQLiteMaintenance(writer).run_once("TRUNCATE")
+    assert busy == 0
+    assert checkpointed == wal_pages
@@ -0,0 +1,50 @@
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app, thread_pools
+from app.auth.jwt_handler import create_access_token
+from app.core.metrics import metrics
+from app.core.threadpool import PATCHED_MODULES, ThreadPools
+
+client = TestClient(app)
+
+def test_sync_calls_are_timed_and_pool_gauges_exported():
+    token = create_access_token({"user_id": 1, "role": "admin"})
+
+    response = client.get("/admin/metrics", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    snapshot = response.json()
+    assert snapshot["histograms"]['threadpool_wait_seconds{pool="default"}']["count"] >= 1
+    assert snapshot["gauges"]['threadpool_size{pool="default"}'] >= 1
+    assert 'threadpool_waiting{pool="default"}' in snapshot["gauges"]
+
+def test_router_pools_selected_by_path_prefix():
+    pools = ThreadPools({"auth": 4, "files": 2})
+
+    assert pools.pool_for_path("/auth/login") == "auth"
+    assert pools.pool_for_path("/files/upload") == "files"
+    assert pools.pool_for_path("/users/me") == "default"
+    assert thread_pools.pool_for_path("/auth/login") == "default"
+
+def test_fastapi_still_calls_the_installed_pools():
+    # Fails when a FastAPI upgrade renames or stops using these bindings
+    for name in PATCHED_MODULES:
+        assert importlib.import_module(name).run_in_threadpool == thread_pools.run_sync
+
+    def waits():
+        return metrics.snapshot()["histograms"]['threadpool_wait_seconds{pool="default"}']["count"]
+
+    before = waits()
+    token = create_access_token({"user_id": 1, "role": "admin"})
+    client.get("/admin/stats", headers={"Authorization": f"Bearer {token}"})
+    # The sync permission dependency and the sync handler
+    assert waits() - before >= 2
+
+def test_install_refuses_unknown_bindings(monkeypatch):
+    import fastapi.routing
+
+    monkeypatch.setattr(fastapi.routing, "run_in_threadpool", lambda func, *args: func(*args))
+    with pytest.raises(RuntimeError):
+        ThreadPools({}).install()
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from app.auth.jwt_handler import create_access_token, verify_access_token, verify_access_tokens, revoke_access_token
+from app.auth.token_denylist import MemoryDenylist, SqliteDenylist
+
+
+def test_revoked_access_token_is_rejected():
+    token = create_access_token({"user_id": 1, "role": "user"})
+    payload = verify_access_token(token)
+    assert payload["jti"]
+
+    revoke_access_token(payload)
+
+    assert verify_access_token(token) == {"error": "revoked"}
+    assert verify_access_token(create_access_token({"user_id": 1, "role": "user"}))["user_id"] == 1
+
+
+def test_memory_denylist_drops_expired_entries():
+    denylist = MemoryDenylist()
+    denylist.add("a" * 32, int(time.time()) - 1)
+    denylist.add("b" * 32, int(time.time()) + 60)
+
+    assert not denylist.contains("a" * 32)
+    assert denylist.contains("b" * 32)
+
+    denylist.add("c" * 32, int(time.time()) + 60)
+    assert len(denylist) == 2
+
+
+def test_sqlite_denylist_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "denylist.db")
+    SqliteDenylist(path).add("d" * 32, int(time.time()) + 60)
+
+    assert SqliteDenylist(path).contains("d" * 32)
+    assert not SqliteDenylist(path).contains("e" * 32)
+
+
+@pytest.mark.parametrize("make", [lambda tmp_path: MemoryDenylist(), lambda tmp_path: SqliteDenylist(str(tmp_path / "d.db"))])
+def test_user_revocation_rejects_only_older_tokens(make, tmp_path):
+    denylist = make(tmp_path)
+    now = time.time()
+    denylist.revoke_user(7, now, int(now) + 60)
+    denylist.revoke_user(8, now - 120, int(now) - 60)  # lapsed
+
+    assert denylist.user_revoked(7, now - 5)
+    assert denylist.user_revoked(7, now - 0.001)
+    # Issued in the same second, but after the revocation
+    assert not denylist.user_revoked(7, now)
+    assert not denylist.user_revoked(7, now + 0.001)
+    assert not denylist.user_revoked(8, now - 200)
+    assert not denylist.user_revoked(9, now)
+
+    denylist.clear_user(7)
+    assert not denylist.user_revoked(7, now - 5)
+
+
+@pytest.mark.parametrize("make", [lambda tmp_path: MemoryDenylist(), lambda tmp_path: SqliteDenylist(str(tmp_path / "d.db"))])
+def test_batch_lookups_match_single_lookups(make, tmp_path):
+    denylist = make(tmp_path)
+    now = time.time()
+    denylist.add("a" * 32, int(now) + 60)
+    denylist.add("not-a-uuid", int(now) + 60)
+    denylist.add("b" * 32, int(now) - 1)  # expired
+    denylist.revoke_user(7, now, int(now) + 60)
+    denylist.revoke_user(8, now, int(now) - 1)  # lapsed
+
+    assert denylist.contains_many(["a" * 32, "b" * 32, "c" * 32, "not-a-uuid"]) == {"a" * 32, "not-a-uuid"}
+    assert denylist.contains_many([]) == set()
+    assert denylist.revoked_users([7, 7, 8, 9]) == {7: pytest.approx(now)}
+
+
+def test_batch_verification_matches_single_verification():
+    revoked, kept = (create_access_token({"user_id": 1, "role": "user"}) for _ in range(2))
+    revoke_access_token(verify_access_token(revoked))
+    tokens = [revoked, kept, "not-a-token"]
+
+    assert verify_access_tokens(tokens) == [verify_access_token(token) for token in tokens]
+    assert verify_access_tokens(tokens)[0] == {"error": "revoked"}
@@ -0,0 +1,88 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.main import app
+from app.database import SessionLocal
+from app.models.user_model import User
+from app.auth.jwt_handler import create_access_token
+from app.tests.conftest import auth_headers, create_user
+
+client = TestClient(app)
+
+def test_read_current_user_returns_response_fields_only():
+    user = create_user()
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # Every engine: reads may go to the SQLite read pool
+    event.listen(Engine, "before_cursor_execute", capture)
+    try:
+        response = client.get("/users/me", headers=auth_headers(user))
+    finally:
+        event.remove(Engine, "before_cursor_execute", capture)
+
+    assert response.status_code == 200
+    # Only the response columns are selected, never the password hash
+    assert statements and not any("hashed_password" in s for s in statements)
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {
+        "id": user.id,
+        "email": user.email,
+        "full_name": "Test User",
+        "role": "user",
+        "is_active": True,
+    }
+
+def test_admin_list_users_page():
+    admin = create_user(role="admin")
+    create_user()
+
+    response = client.get("/admin/users?sort=desc&limit=2", headers=auth_headers(admin))
+
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page) == 2
+    assert page[0]["id"] > page[1]["id"]
+    assert set(page[0]) == {"id", "email", "full_name", "role", "is_active"}
+
+def test_read_current_user_conditional_get():
+    user = create_user()
+    headers = auth_headers(user)
+
+    first = client.get("/users/me", headers=headers)
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+    assert "last-modified" in first.headers
+
+    second = client.get("/users/me", headers={**headers, "If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+
+    since = client.get("/users/me", headers={**headers, "If-Modified-Since": first.headers["last-modified"]})
+    assert since.status_code == 304
+
+    db = SessionLocal()
+    try:
+        db.get(User, user.id).full_name = "Renamed"
+        db.commit()
+    finally:
+        db.close()
+
+    third = client.get("/users/me", headers={**headers, "If-None-Match": etag})
+    assert third.status_code == 200
+    assert third.json()["full_name"] == "Renamed"
+    assert third.headers["etag"] != etag
+
+def test_admin_routes_authorize_from_token_permissions():
+    user = create_user()
+    assert client.get("/admin/users", headers=auth_headers(user)).status_code == 403
+
+    # The permission bitmask comes from the token; deactivation revokes the
+    # token itself (see test_soft_delete.py)
+    admin = create_user(role="admin")
+    token = create_access_token({"user_id": admin.id, "role": "admin"})
+    response = client.get("/admin/stats", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
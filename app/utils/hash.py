@@ -1,7 +1,37 @@
 from passlib.context import CryptContext
 import hashlib
+from typing import Optional, Tuple
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.config import (
+    PASSWORD_HASH_SCHEME,
+    BCRYPT_ROUNDS,
+    ARGON2_TIME_COST,
+    ARGON2_MEMORY_COST_KB,
+    ARGON2_PARALLELISM,
+)
+
+SUPPORTED_SCHEMES = ("bcrypt", "argon2")
+
+
+def build_context(scheme: str = "bcrypt", bcrypt_rounds: int = 12) -> CryptContext:
+    """
+    Builds a CryptContext that hashes with `scheme` and still verifies the
+    other supported scheme. Any hash made with a non-default scheme or with
+    different cost settings is reported by `needs_update`.
+    """
+    schemes = [scheme] + [s for s in SUPPORTED_SCHEMES if s != scheme]
+    return CryptContext(
+        schemes=schemes,
+        default=scheme,
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        argon2__time_cost=ARGON2_TIME_COST,
+        argon2__memory_cost=ARGON2_MEMORY_COST_KB,
+        argon2__parallelism=ARGON2_PARALLELISM,
+    )
+
+
+pwd_context = build_context(PASSWORD_HASH_SCHEME, BCRYPT_ROUNDS)
 
 def _normalize_password(password: str) -> str:
     """
@@ -18,4 +48,15 @@ def hash_password(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     safe_password = _normalize_password(plain_password)
-    return pwd_context.verify(safe_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(safe_password, hashed_password)
+
+def verify_and_rehash(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies the password and, when the stored hash uses an outdated scheme
+    or cost, returns a fresh hash to store. Returns (valid, new_hash_or_None).
+    """
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+    if pwd_context.needs_update(hashed_password):
+        return True, hash_password(plain_password)
+    return True, None
@@ -0,0 +1,32 @@
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.models.user_model import User
+from app.schemas.user_schema import user_row_adapter, user_rows_adapter
+
+# Columns backing UserResponse. Selecting only these avoids loading
+# hashed_password and the other unused columns on read endpoints.
+USER_RESPONSE_COLUMNS = (User.id, User.email, User.full_name, User.role, User.is_active)
+
+
+class PrebuiltJSONResponse(Response):
+    """Response for bodies that are already encoded JSON bytes."""
+    media_type = "application/json"
+
+
+def json_response(adapter: TypeAdapter, data, status_code: int = 200) -> PrebuiltJSONResponse:
+    return PrebuiltJSONResponse(content=adapter.dump_json(data), status_code=status_code)
+
+
+def user_json(user) -> PrebuiltJSONResponse:
+    """Serializes a User ORM object or a selected row as UserResponse JSON."""
+    if hasattr(user, "_asdict"):
+        data = user._asdict()
+    else:
+        data = {column.key: getattr(user, column.key) for column in USER_RESPONSE_COLUMNS}
+    return json_response(user_row_adapter, data)
+
+
+def users_json(rows) -> PrebuiltJSONResponse:
+    """Serializes rows selected with USER_RESPONSE_COLUMNS as a UserResponse list."""
+    return json_response(user_rows_adapter, [row._asdict() for row in rows])